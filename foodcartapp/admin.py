@@ -4,8 +4,11 @@ from django.shortcuts import reverse, redirect
 from django.templatetags.static import static
 from django.utils.html import format_html
 from django.utils.http import url_has_allowed_host_and_scheme
-from foodcartapp.views import create_location
+from geocoder.geocoding import schedule_location_geocoding
 
+from .assignment import assign_restaurants
+
+from .models import Banner
 from .models import Product
 from .models import ProductCategory
 from .models import Restaurant
@@ -19,6 +22,20 @@ class RestaurantMenuItemInline(admin.TabularInline):
     extra = 0
 
 
+@admin.register(Banner)
+class BannerAdmin(admin.ModelAdmin):
+    list_display = [
+        'title',
+        'text',
+        'position',
+        'is_active',
+    ]
+    list_editable = [
+        'position',
+        'is_active',
+    ]
+
+
 @admin.register(Restaurant)
 class RestaurantAdmin(admin.ModelAdmin):
     search_fields = [
@@ -36,8 +53,9 @@ class RestaurantAdmin(admin.ModelAdmin):
     ]
 
     def save_model(self, request, obj, form, change):
-        create_location(obj.address)
         super().save_model(request, obj, form, change)
+        if not change or 'address' in form.changed_data:
+            schedule_location_geocoding(obj.address)
 
 
 @admin.register(Product)
@@ -125,6 +143,9 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = [
         OrderPositionInline,
     ]
+    actions = [
+        'assign_nearest_restaurants',
+    ]
 
     def response_change(self, request, obj):
         response = super().response_change(request, obj)
@@ -133,5 +154,11 @@ class OrderAdmin(admin.ModelAdmin):
         return response
 
     def save_model(self, request, obj, form, change):
-        create_location(obj.address)
         super().save_model(request, obj, form, change)
+        if not change or 'address' in form.changed_data:
+            schedule_location_geocoding(obj.address)
+
+    def assign_nearest_restaurants(self, request, queryset):
+        assigned_orders = assign_restaurants(queryset.only('id', 'restaurant'))
+        self.message_user(request, f'Назначено заказов: {len(assigned_orders)}')
+    assign_nearest_restaurants.short_description = 'Назначить ближайший ресторан'
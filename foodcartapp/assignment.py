@@ -0,0 +1,32 @@
+from django.db.models import F
+
+from .models import Order, RestaurantCandidate
+
+
+def get_nearest_restaurants(orders):
+    candidates = (
+        RestaurantCandidate.objects
+        .filter(order__in=orders, distance__isnull=False)
+        .order_by('order', F('distance').asc(), 'restaurant')
+        .values_list('order', 'restaurant')
+    )
+
+    nearest_restaurants = {}
+    for order_id, restaurant_id in candidates.iterator():
+        nearest_restaurants.setdefault(order_id, restaurant_id)
+    return nearest_restaurants
+
+
+def assign_restaurants(orders):
+    orders = list(orders)
+    nearest_restaurants = get_nearest_restaurants(orders)
+
+    assigned_orders = []
+    for order in orders:
+        restaurant_id = nearest_restaurants.get(order.id)
+        if restaurant_id and restaurant_id != order.restaurant_id:
+            order.restaurant_id = restaurant_id
+            assigned_orders.append(order)
+
+    Order.objects.bulk_update(assigned_orders, ['restaurant'], batch_size=1000)
+    return assigned_orders
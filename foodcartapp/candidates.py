@@ -0,0 +1,171 @@
+from django.conf import settings
+from django.db import transaction
+
+from .catalogue import get_menu_index, invalidate_menu_index
+from .models import Order, Restaurant, RestaurantCandidate
+from geocoder.models import Location
+from geocoder.spatial import SpatialIndex
+from star_burger import caching
+
+
+RESTAURANTS_NAMESPACE = 'restaurants'
+
+
+class CandidatesRefresh:
+    """Orders changed in one transaction, refreshed together on commit."""
+
+    def __init__(self):
+        self.order_ids = set()
+        self.menu_changed = False
+        self.restaurants_changed = False
+
+    def __call__(self):
+        # Other on_commit hooks may drop these caches only after this one runs
+        if self.menu_changed:
+            invalidate_menu_index()
+        if self.restaurants_changed:
+            invalidate_restaurants_spatial_index()
+        refresh_candidates(self.order_ids)
+
+
+def schedule_candidates_refresh(order_ids, menu_changed=False, restaurants_changed=False):
+    order_ids = set(order_ids)
+    if not order_ids:
+        return
+
+    connection = transaction.get_connection()
+    candidates_refresh = getattr(connection, 'candidates_refresh', None)
+    is_new = not is_scheduled(connection, candidates_refresh)
+    if is_new:
+        candidates_refresh = connection.candidates_refresh = CandidatesRefresh()
+
+    candidates_refresh.order_ids.update(order_ids)
+    candidates_refresh.menu_changed |= menu_changed
+    candidates_refresh.restaurants_changed |= restaurants_changed
+    if is_new:
+        transaction.on_commit(candidates_refresh)
+
+
+def is_scheduled(connection, callback):
+    # Hooks of a rolled back transaction are discarded, so a refresh is
+    # reused only while it is still waiting for the commit
+    return callback is not None and any(
+        hook[1] is callback for hook in connection.run_on_commit
+    )
+
+
+def refresh_candidates(order_ids):
+    orders = list(
+        Order.objects
+        .filter(id__in=order_ids)
+        .exclude(status='COMPLETED')
+        .with_product_ids()
+    )
+
+    menu_index = get_menu_index()
+    spatial_index = get_restaurants_spatial_index()
+    locations, _ = Location.objects.get_coordinates(
+        {order.address for order in orders}
+    )
+
+    candidates = []
+    for order in orders:
+        restaurant_ids = menu_index.get_restaurant_ids(order.get_product_ids())
+        if order.address in locations:
+            restaurants_distances = find_nearest_restaurants(
+                locations[order.address], restaurant_ids, spatial_index,
+            )
+        else:
+            restaurants_distances = [
+                (restaurant_id, None) for restaurant_id in restaurant_ids
+            ]
+
+        candidates.extend(
+            RestaurantCandidate(
+                order=order,
+                restaurant_id=restaurant_id,
+                distance=distance,
+            )
+            for restaurant_id, distance in restaurants_distances
+        )
+
+    with transaction.atomic():
+        RestaurantCandidate.objects.filter(order__in=order_ids).delete()
+        RestaurantCandidate.objects.bulk_create(candidates, batch_size=1000)
+
+
+def find_nearest_restaurants(location, restaurant_ids, spatial_index=None):
+    if spatial_index is None:
+        spatial_index = get_restaurants_spatial_index()
+    latitude, longitude = location
+    limit = settings.RESTAURANT_CANDIDATES_LIMIT
+    radius = settings.RESTAURANT_SEARCH_RADIUS_KM
+
+    restaurants_distances = spatial_index.nearest(
+        latitude, longitude, k=limit, radius_km=radius, keys=restaurant_ids,
+    )
+    if limit is None and radius is None:
+        located_ids = {restaurant_id for restaurant_id, _ in restaurants_distances}
+        restaurants_distances.extend(
+            (restaurant_id, None)
+            for restaurant_id in restaurant_ids
+            if restaurant_id not in located_ids
+        )
+    return restaurants_distances
+
+
+def get_restaurants_spatial_index():
+    return caching.get_or_compute(
+        RESTAURANTS_NAMESPACE, 'spatial_index', build_restaurants_spatial_index,
+    )
+
+
+def invalidate_restaurants_spatial_index():
+    caching.invalidate(RESTAURANTS_NAMESPACE)
+
+
+def build_restaurants_spatial_index():
+    restaurants = Restaurant.objects.values_list('id', 'address')
+    locations, _ = Location.objects.get_coordinates(
+        {address for _, address in restaurants}
+    )
+    return SpatialIndex({
+        restaurant_id: locations[address]
+        for restaurant_id, address in restaurants
+        if address in locations
+    })
+
+
+def get_orders_near_restaurants(restaurant_addresses):
+    """Return open orders whose candidates may change when restaurants move."""
+    order_ids = set(
+        get_open_orders(candidates__restaurant__address__in=restaurant_addresses)
+    )
+    limit = settings.RESTAURANT_CANDIDATES_LIMIT
+    radius = settings.RESTAURANT_SEARCH_RADIUS_KM
+    if limit is None and radius is None:
+        # Every capable restaurant is already a candidate of its orders
+        return order_ids
+    if radius is None:
+        order_ids.update(get_open_orders())
+        return order_ids
+
+    restaurant_locations, _ = Location.objects.get_coordinates(restaurant_addresses)
+    nearby_addresses = set()
+    for latitude, longitude in restaurant_locations.values():
+        nearby_addresses.update(
+            location.normalized_address
+            for location in Location.objects.near(latitude, longitude, radius)
+        )
+    order_ids.update(get_open_orders(normalized_address__in=nearby_addresses))
+    return order_ids
+
+
+def get_open_orders(**filters):
+    return (
+        Order.objects
+        .exclude(status='COMPLETED')
+        .filter(**filters)
+        .values_list('id', flat=True)
+        .distinct()
+    )
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Banner, Product, Restaurant, RestaurantMenuItem
+from star_burger import caching
+
+
+CATALOGUE_NAMESPACE = 'catalogue'
+BANNERS_NAMESPACE = 'banners'
+MENU_NAMESPACE = 'menu'
+BANNERS_FILENAME = 'banners.json'
+
+
+def get_catalogue():
+    return caching.get_or_compute(
+        CATALOGUE_NAMESPACE, 'products', build_catalogue,
+    )
+
+
+def invalidate_catalogue():
+    caching.invalidate(CATALOGUE_NAMESPACE)
+
+
+def build_catalogue():
+    products = Product.objects.select_related('category').filter(available_anywhere=True)
+    return build_payload([serialize_product(product) for product in products])
+
+
+def get_restaurant_menu(restaurant_id):
+    return caching.get_or_compute(
+        get_restaurant_menu_namespace(restaurant_id), 'products',
+        lambda: build_restaurant_menu(restaurant_id),
+    )
+
+
+def invalidate_restaurant_menus(restaurant_ids):
+    for restaurant_id in restaurant_ids:
+        caching.invalidate(get_restaurant_menu_namespace(restaurant_id))
+
+
+def get_restaurant_menu_namespace(restaurant_id):
+    return f'restaurant_menu:{restaurant_id}'
+
+
+def build_restaurant_menu(restaurant_id):
+    restaurant = Restaurant.objects.only('id', 'name').get(pk=restaurant_id)
+    menu_items = (
+        RestaurantMenuItem.objects
+        .filter(restaurant=restaurant, availability=True)
+        .select_related('product__category')
+        .order_by('product')
+    )
+    return build_payload([
+        serialize_product(menu_item.product, restaurant)
+        for menu_item in menu_items
+    ])
+
+
+def get_menu_index():
+    return caching.get_or_compute(
+        MENU_NAMESPACE, 'index', RestaurantMenuItem.objects.get_menu_index,
+    )
+
+
+def invalidate_menu_index():
+    caching.invalidate(MENU_NAMESPACE)
+
+
+def get_banners():
+    return caching.get_or_compute(BANNERS_NAMESPACE, 'active', build_banners)
+
+
+def invalidate_banners():
+    caching.invalidate(BANNERS_NAMESPACE)
+
+
+def build_banners():
+    banners = Banner.objects.filter(is_active=True)
+    return build_payload([serialize_banner(banner) for banner in banners])
+
+
+def write_banners_file():
+    os.makedirs(settings.STATIC_ROOT, exist_ok=True)
+    path = os.path.join(settings.STATIC_ROOT, BANNERS_FILENAME)
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'wb') as banners_file:
+        banners_file.write(build_banners()['content'])
+    os.replace(temporary_path, path)
+    return path
+
+
+def build_payload(data):
+    content = dump_json(data)
+    return {
+        'content': content,
+        'etag': f'"{hashlib.md5(content).hexdigest()}"',
+        'last_modified': int(timezone.now().timestamp()),
+    }
+
+
+def serialize_product(product, restaurant=None):
+    category = product.category
+    return {
+        'id': product.id,
+        'name': product.name,
+        'price': product.price,
+        'special_status': product.special_status,
+        'description': product.description,
+        'category': {
+            'id': category.id,
+            'name': category.name,
+        } if category else None,
+        'image': product.image.url,
+        'restaurant': {
+            'id': restaurant.id,
+            'name': restaurant.name,
+        } if restaurant else {
+            'id': product.id,
+            'name': product.name,
+        }
+    }
+
+
+def serialize_banner(banner):
+    return {
+        'title': banner.title,
+        'src': banner.get_image_url(),
+        'text': banner.text,
+    }
+
+
+def dump_json(data):
+    return json.dumps(
+        data,
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode()
@@ -0,0 +1,103 @@
+import csv
+import json
+
+from django.db import transaction
+
+from .candidates import schedule_candidates_refresh
+from .models import Order, OrderPosition, Product
+from .serializers import OrderSerializer
+from geocoder.addresses import normalize_address
+from geocoder.geocoding import enqueue_locations
+
+
+ORDER_FIELDS = ['firstname', 'lastname', 'phonenumber', 'address']
+
+
+def parse_orders(lines, file_format):
+    """Yield (row number, order data) pairs from JSON Lines or CSV.
+
+    CSV files have a header with the order fields and a `products` column
+    holding the same JSON list as the order API. A row that can't be
+    decoded is yielded as an error string instead of a dict.
+    """
+    if file_format == 'csv':
+        rows = enumerate(csv.DictReader(lines), start=2)
+        for row_number, row in rows:
+            try:
+                row['products'] = json.loads(row.get('products') or '[]')
+            except json.JSONDecodeError as error:
+                yield row_number, f'products: {error}'
+                continue
+            yield row_number, row
+        return
+
+    for row_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield row_number, str(error)
+            continue
+        if not isinstance(data, dict):
+            yield row_number, f'Expected a JSON object, got {get_json_type(data)}'
+            continue
+        yield row_number, data
+
+
+def get_json_type(value):
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    return 'array'
+
+
+def import_orders(rows):
+    products = Product.objects.available().in_bulk()
+
+    results = []
+    valid_rows = []
+    for row_number, data in rows:
+        if not isinstance(data, dict):
+            results.append({'row': row_number, 'errors': {'non_field_errors': [data]}})
+            continue
+
+        serializer = OrderSerializer(data=data, context={'products': products})
+        if serializer.is_valid():
+            valid_rows.append((row_number, serializer.validated_data))
+        else:
+            results.append({'row': row_number, 'errors': serializer.errors})
+
+    with transaction.atomic():
+        orders = Order.objects.bulk_create(
+            [
+                Order(
+                    normalized_address=normalize_address(valid_data['address']),
+                    **{field: valid_data[field] for field in ORDER_FIELDS},
+                )
+                for _, valid_data in valid_rows
+            ],
+            batch_size=500,
+        )
+
+        positions = []
+        for order, (_, valid_data) in zip(orders, valid_rows):
+            for fields in valid_data['products']:
+                position = OrderPosition(order=order, **fields)
+                position.total_price = position.calculate_actual_price()
+                positions.append(position)
+        OrderPosition.objects.bulk_create(positions, batch_size=1000)
+
+        enqueue_locations(valid_data['address'] for _, valid_data in valid_rows)
+        schedule_candidates_refresh(order.id for order in orders)
+
+    results.extend(
+        {'row': row_number, 'id': order.id}
+        for order, (row_number, _) in zip(orders, valid_rows)
+    )
+    return sorted(results, key=lambda result: result['row'])
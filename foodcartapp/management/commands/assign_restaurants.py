@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from foodcartapp.assignment import assign_restaurants
+from foodcartapp.candidates import refresh_candidates
+from foodcartapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Назначает незавершённым заказам без ресторана ближайший подходящий ресторан'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh', action='store_true',
+            help='сначала пересчитать рестораны-кандидаты',
+        )
+
+    def handle(self, *args, **options):
+        orders = list(
+            Order.objects
+            .filter(restaurant__isnull=True)
+            .exclude(status='COMPLETED')
+            .only('id', 'restaurant')
+        )
+        if options['refresh']:
+            refresh_candidates([order.id for order in orders])
+
+        with transaction.atomic():
+            assigned_orders = assign_restaurants(orders)
+
+        self.stdout.write(
+            f'Назначено заказов: {len(assigned_orders)} из {len(orders)}'
+        )
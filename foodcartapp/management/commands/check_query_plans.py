@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from foodcartapp.models import Order, Product, RestaurantCandidate, RestaurantMenuItem
+from geocoder.models import Location
+
+
+def get_hot_queries():
+    return {
+        'новые заказы': (
+            Order.objects
+            .get_total_cost()
+            .filter(status='UNANSWERED')
+            .order_by('created_at', 'id')[:101]
+        ),
+        'заказы по статусу': (
+            Order.objects
+            .filter(status='EN_ROUTE')
+            .order_by('created_at', 'id')[:101]
+        ),
+        'каталог': (
+            Product.objects
+            .select_related('category')
+            .filter(available_anywhere=True)
+        ),
+        'товары в продаже': Product.objects.available().filter(pk__in=[1, 2, 3]),
+        'меню ресторанов': (
+            RestaurantMenuItem.objects
+            .filter(availability=True)
+            .values_list('product', 'restaurant')
+        ),
+        'меню ресторана': (
+            RestaurantMenuItem.objects
+            .filter(restaurant=1, availability=True)
+            .select_related('product__category')
+            .order_by('product')
+        ),
+        'рестораны-кандидаты': (
+            RestaurantCandidate.objects
+            .filter(order__in=[1, 2, 3], distance__isnull=False)
+            .order_by('order', 'distance')
+        ),
+        'координаты адресов': (
+            Location.objects
+            .filter(normalized_address__in=['москва улица тверская 1'])
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Проверяет, что частые запросы используют индексы, а не последовательное чтение таблиц'
+
+    def handle(self, *args, **options):
+        failed_queries = []
+        for name, queryset in get_hot_queries().items():
+            plan = explain_without_seqscan(queryset)
+            if 'Seq Scan' in plan:
+                failed_queries.append(name)
+                self.stdout.write(f'{name}: последовательное чтение\n{plan}')
+            else:
+                self.stdout.write(f'{name}: ok')
+                if options['verbosity'] > 1:
+                    self.stdout.write(plan)
+
+        if failed_queries:
+            raise CommandError(
+                f'Запросы без индекса: {", ".join(failed_queries)}'
+            )
+
+
+def explain_without_seqscan(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        raise CommandError('Планы запросов проверяются только на PostgreSQL')
+
+    # On small tables the planner prefers sequential scans, so forbid them
+    # and see whether a usable index exists at all
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
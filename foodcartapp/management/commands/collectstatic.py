@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.staticfiles.management.commands import collectstatic
+
+from foodcartapp.catalogue import write_banners_file
+
+
+class Command(collectstatic.Command):
+    def handle(self, **options):
+        result = super().handle(**options)
+        if settings.BANNERS_STATIC_FILE and not options['dry_run']:
+            path = write_banners_file()
+            if options['verbosity'] >= 1:
+                self.stdout.write(f'Banners written to {path}')
+        return result
@@ -0,0 +1,34 @@
+import io
+import sys
+
+from django.core.management.base import BaseCommand
+
+from foodcartapp.importing import import_orders, parse_orders
+
+
+class Command(BaseCommand):
+    help = 'Импортирует заказы из файла JSON Lines или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='путь к файлу, «-» для stdin')
+        parser.add_argument('--format', choices=['jsonl', 'csv'])
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+
+        # Excel and call-centre tools start CSV files with a byte order mark
+        if path == '-':
+            stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+            results = import_orders(parse_orders(stdin, file_format))
+        else:
+            with open(path, encoding='utf-8-sig', newline='') as orders_file:
+                results = import_orders(parse_orders(orders_file, file_format))
+
+        created = 0
+        for result in results:
+            if 'errors' in result:
+                self.stderr.write(f'Строка {result["row"]}: {result["errors"]}')
+            else:
+                created += 1
+        self.stdout.write(f'Создано заказов: {created}, с ошибками: {len(results) - created}')
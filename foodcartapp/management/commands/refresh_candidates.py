@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.candidates import get_open_orders, refresh_candidates
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рестораны-кандидаты и расстояния для незавершённых заказов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        order_ids = list(get_open_orders().order_by('id'))
+        batch_size = options['batch_size']
+        for batch_start in range(0, len(order_ids), batch_size):
+            refresh_candidates(order_ids[batch_start:batch_start + batch_size])
+        self.stdout.write(f'Обновлено заказов: {len(order_ids)}')
@@ -0,0 +1,32 @@
+# Generated by Django 3.2 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+def fill_available_anywhere(apps, schema_editor):
+    Product = apps.get_model('foodcartapp', 'Product')
+    RestaurantMenuItem = apps.get_model('foodcartapp', 'RestaurantMenuItem')
+    Product.objects.update(
+        available_anywhere=models.Exists(
+            RestaurantMenuItem.objects.filter(
+                product=models.OuterRef('pk'),
+                availability=True,
+            )
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0051_restaurantcandidate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='available_anywhere',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='есть в продаже'),
+        ),
+        migrations.RunPython(fill_available_anywhere, migrations.RunPython.noop),
+    ]
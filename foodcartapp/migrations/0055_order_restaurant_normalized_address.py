@@ -0,0 +1,35 @@
+# Generated by Django 3.2 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+from geocoder.addresses import normalize_address
+
+
+def fill_normalized_addresses(apps, schema_editor):
+    for model_name in ['Order', 'Restaurant']:
+        model = apps.get_model('foodcartapp', model_name)
+        objects = list(model.objects.only('address'))
+        for obj in objects:
+            obj.normalized_address = normalize_address(obj.address)
+        model.objects.bulk_update(objects, ['normalized_address'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0054_order_menuitem_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='normalized_address',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200, verbose_name='нормализованный адрес'),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='normalized_address',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200, verbose_name='нормализованный адрес'),
+        ),
+        migrations.RunPython(fill_normalized_addresses, migrations.RunPython.noop),
+    ]
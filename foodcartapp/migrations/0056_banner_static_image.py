@@ -0,0 +1,52 @@
+# Generated by Django 3.2 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+SEEDED_IMAGES = {
+    'Burger': 'burger.jpg',
+    'Spices': 'food.jpg',
+    'New York': 'tasty.jpg',
+}
+
+
+def move_seeded_images(apps, schema_editor):
+    Banner = apps.get_model('foodcartapp', 'Banner')
+    storage = Banner._meta.get_field('image').storage
+    # Banners seeded by 0050 reference images from assets/, which are
+    # served as static files and were never uploaded to the storage
+    banners = [
+        banner for banner in Banner.objects.filter(title__in=SEEDED_IMAGES)
+        if banner.image.name == SEEDED_IMAGES[banner.title]
+        and not storage.exists(banner.image.name)
+    ]
+    for banner in banners:
+        banner.static_image = banner.image.name
+        banner.image = ''
+    Banner.objects.bulk_update(banners, ['image', 'static_image'])
+
+
+def restore_seeded_images(apps, schema_editor):
+    Banner = apps.get_model('foodcartapp', 'Banner')
+    Banner.objects.filter(image='').update(image=models.F('static_image'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0055_order_restaurant_normalized_address'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='banner',
+            name='static_image',
+            field=models.CharField(blank=True, help_text='путь среди статических файлов, если картинка не загружена', max_length=100, verbose_name='картинка из статики'),
+        ),
+        migrations.AlterField(
+            model_name='banner',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='', verbose_name='картинка'),
+        ),
+        migrations.RunPython(move_seeded_images, restore_seeded_images),
+    ]
@@ -1,8 +1,13 @@
-from django.db import models
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connections, models
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxLengthValidator
+from django.templatetags.static import static
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
+from geocoder.addresses import normalize_address
+
 
 class Restaurant(models.Model):
     name = models.CharField(
@@ -14,6 +19,13 @@ class Restaurant(models.Model):
         max_length=100,
         blank=True,
     )
+    normalized_address = models.CharField(
+        'нормализованный адрес',
+        max_length=200,
+        blank=True,
+        db_index=True,
+        editable=False,
+    )
     contact_phone = PhoneNumberField(
         'контактный телефон',
         max_length=20,
@@ -27,15 +39,93 @@ class Restaurant(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        restaurant = super().from_db(db, field_names, values)
+        restaurant.remember_saved_address()
+        return restaurant
+
+    def save(self, *args, **kwargs):
+        self.normalized_address = normalize_address(self.address)
+        super().save(*args, **kwargs)
+        self.remember_saved_address()
+
+    def remember_saved_address(self):
+        # Signal handlers refresh candidates only when the restaurant moves,
+        # both around the new address and around the one it left
+        self.saved_address = self.__dict__.get('address')
+
+    def is_moved(self):
+        return getattr(self, 'saved_address', None) != self.address
+
+    def get_addresses(self):
+        return {self.address, getattr(self, 'saved_address', None)} - {None}
+
+
+class Banner(models.Model):
+    title = models.CharField(
+        'заголовок',
+        max_length=50,
+    )
+    image = models.ImageField(
+        'картинка',
+        blank=True,
+    )
+    static_image = models.CharField(
+        'картинка из статики',
+        max_length=100,
+        blank=True,
+        help_text='путь среди статических файлов, если картинка не загружена',
+    )
+    text = models.CharField(
+        'текст',
+        max_length=200,
+        blank=True,
+    )
+    position = models.PositiveIntegerField(
+        'порядок',
+        default=0,
+        db_index=True,
+    )
+    is_active = models.BooleanField(
+        'показывать',
+        default=True,
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = 'баннер'
+        verbose_name_plural = 'баннеры'
+        ordering = ['position']
+
+    def __str__(self):
+        return self.title
+
+    def clean(self):
+        if not self.image and not self.static_image:
+            raise ValidationError('Загрузите картинку или укажите путь к статической')
+
+    def get_image_url(self):
+        if self.image:
+            return self.image.url
+        return static(self.static_image)
+
+
+def get_product_availability():
+    return models.Exists(
+        RestaurantMenuItem.objects.filter(
+            product=models.OuterRef('pk'),
+            availability=True,
+        )
+    )
+
 
 class ProductQuerySet(models.QuerySet):
     def available(self):
-        products = (
-            RestaurantMenuItem.objects
-            .filter(availability=True)
-            .values_list('product')
-        )
-        return self.filter(pk__in=products)
+        return self.filter(get_product_availability())
+
+    def update_availability(self):
+        return self.update(available_anywhere=get_product_availability())
 
 
 class ProductCategory(models.Model):
@@ -84,6 +174,12 @@ class Product(models.Model):
         max_length=200,
         blank=True,
     )
+    available_anywhere = models.BooleanField(
+        'есть в продаже',
+        default=False,
+        db_index=True,
+        editable=False,
+    )
 
     objects = ProductQuerySet.as_manager()
 
@@ -95,6 +191,55 @@ class Product(models.Model):
         return self.name
 
 
+class RestaurantMenuIndex:
+    def __init__(self, menu_items):
+        self.restaurant_ids = []
+        self.restaurant_bits = {}
+        self.product_masks = {}
+
+        for product_id, restaurant_id in menu_items:
+            if restaurant_id not in self.restaurant_bits:
+                self.restaurant_bits[restaurant_id] = 1 << len(self.restaurant_ids)
+                self.restaurant_ids.append(restaurant_id)
+            self.product_masks[product_id] = (
+                self.product_masks.get(product_id, 0)
+                | self.restaurant_bits[restaurant_id]
+            )
+
+    def get_availability(self, product_id, restaurant_ids):
+        mask = self.product_masks.get(product_id, 0)
+        return [
+            bool(mask & self.restaurant_bits.get(restaurant_id, 0))
+            for restaurant_id in restaurant_ids
+        ]
+
+    def get_restaurant_ids(self, product_ids):
+        product_ids = set(product_ids)
+        if not product_ids:
+            return []
+
+        mask = (1 << len(self.restaurant_ids)) - 1
+        for product_id in product_ids:
+            mask &= self.product_masks.get(product_id, 0)
+            if not mask:
+                return []
+
+        return [
+            restaurant_id
+            for position, restaurant_id in enumerate(self.restaurant_ids)
+            if mask >> position & 1
+        ]
+
+
+class RestaurantMenuItemQuerySet(models.QuerySet):
+    def get_menu_index(self):
+        menu_items = (
+            self.filter(availability=True)
+            .values_list('product', 'restaurant')
+        )
+        return RestaurantMenuIndex(menu_items)
+
+
 class RestaurantMenuItem(models.Model):
     restaurant = models.ForeignKey(
         Restaurant,
@@ -114,16 +259,48 @@ class RestaurantMenuItem(models.Model):
         db_index=True,
     )
 
+    objects = RestaurantMenuItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'пункт меню ресторана'
         verbose_name_plural = 'пункты меню ресторана'
         unique_together = [
             ['restaurant', 'product']
         ]
+        indexes = [
+            models.Index(fields=['restaurant', 'availability']),
+            models.Index(
+                fields=['product', 'restaurant'],
+                condition=models.Q(availability=True),
+                name='menuitem_available_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.restaurant.name} - {self.product.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        menu_item = super().from_db(db, field_names, values)
+        menu_item.remember_saved_relations()
+        return menu_item
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.remember_saved_relations()
+
+    def remember_saved_relations(self):
+        # Signal handlers also update the product and restaurant the item
+        # belonged to before it was moved
+        self.saved_product_id = self.__dict__.get('product_id')
+        self.saved_restaurant_id = self.__dict__.get('restaurant_id')
+
+    def get_product_ids(self):
+        return {self.product_id, getattr(self, 'saved_product_id', None)} - {None}
+
+    def get_restaurant_ids(self):
+        return {self.restaurant_id, getattr(self, 'saved_restaurant_id', None)} - {None}
+
 
 class OrderQuerySet(models.QuerySet):
     def get_total_cost(self):
@@ -131,6 +308,18 @@ class OrderQuerySet(models.QuerySet):
             self.annotate(cost=models.Sum(models.F('positions__total_price')))
         )
 
+    def with_product_ids(self):
+        if connections[self.db].vendor == 'postgresql':
+            return self.annotate(product_ids=ArrayAgg(
+                'positions__product',
+                distinct=True,
+                filter=models.Q(positions__isnull=False),
+            ))
+        return self.prefetch_related(models.Prefetch(
+            'positions',
+            queryset=OrderPosition.objects.only('order', 'product'),
+        ))
+
 
 class Order(models.Model):
     STATUS = (
@@ -159,6 +348,13 @@ class Order(models.Model):
         'адрес',
         max_length=100,
     )
+    normalized_address = models.CharField(
+        'нормализованный адрес',
+        max_length=200,
+        blank=True,
+        db_index=True,
+        editable=False,
+    )
 
     status = models.CharField(
         'статус',
@@ -212,10 +408,63 @@ class Order(models.Model):
     class Meta:
         verbose_name = 'заказ'
         verbose_name_plural = 'заказы'
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at', 'id'],
+                name='order_status_created_idx',
+            ),
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(status='UNANSWERED'),
+                name='order_unanswered_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.firstname} {self.lastname}'
 
+    def save(self, *args, **kwargs):
+        self.normalized_address = normalize_address(self.address)
+        super().save(*args, **kwargs)
+
+    def get_product_ids(self):
+        if hasattr(self, 'product_ids'):
+            return self.product_ids or []
+        return [position.product_id for position in self.positions.all()]
+
+
+class RestaurantCandidate(models.Model):
+    order = models.ForeignKey(
+        Order,
+        related_name='candidates',
+        verbose_name='заказ',
+        on_delete=models.CASCADE,
+    )
+    restaurant = models.ForeignKey(
+        Restaurant,
+        related_name='candidates',
+        verbose_name='ресторан',
+        on_delete=models.CASCADE,
+    )
+    distance = models.FloatField(
+        'расстояние, км',
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'ресторан для заказа'
+        verbose_name_plural = 'рестораны для заказов'
+        unique_together = [
+            ['order', 'restaurant']
+        ]
+        indexes = [
+            models.Index(fields=['order', 'distance']),
+        ]
+
+    def __str__(self):
+        return f'{self.order} - {self.restaurant}'
+
 
 class OrderPosition(models.Model):
     order = models.ForeignKey(
@@ -0,0 +1,45 @@
+from rest_framework.serializers import IntegerField, ModelSerializer, ValidationError
+
+from .models import Product, Order, OrderPosition
+
+
+class OrderPositionSerializer(ModelSerializer):
+    product = IntegerField(min_value=1)
+
+    class Meta:
+        model = OrderPosition
+        fields = ['product', 'quantity']
+
+
+class OrderSerializer(ModelSerializer):
+    products = OrderPositionSerializer(
+        many=True, allow_empty=False, write_only=True,
+    )
+
+    class Meta:
+        model = Order
+        fields = [
+            'id',
+            'firstname',
+            'lastname',
+            'phonenumber',
+            'address',
+            'products',
+        ]
+
+    def validate_products(self, positions):
+        product_ids = {position['product'] for position in positions}
+        products = self.context.get('products')
+        if products is None:
+            products = Product.objects.available().in_bulk(product_ids)
+
+        missing_ids = product_ids - products.keys()
+        if missing_ids:
+            raise ValidationError([
+                f'Товар с id {product_id} не найден или не продаётся'
+                for product_id in sorted(missing_ids)
+            ])
+
+        for position in positions:
+            position['product'] = products[position['product']]
+        return positions
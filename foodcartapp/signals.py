@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .candidates import (
+    get_open_orders,
+    get_orders_near_restaurants,
+    invalidate_restaurants_spatial_index,
+    schedule_candidates_refresh,
+)
+from .catalogue import (
+    invalidate_banners,
+    invalidate_catalogue,
+    invalidate_menu_index,
+    invalidate_restaurant_menus,
+    write_banners_file,
+)
+from .models import Banner, Order, OrderPosition, Product, ProductCategory, Restaurant, RestaurantMenuItem
+from geocoder.models import Location
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_save, sender=RestaurantMenuItem)
+@receiver(post_delete, sender=RestaurantMenuItem)
+def clear_catalogue(sender, **kwargs):
+    transaction.on_commit(invalidate_catalogue)
+
+
+@receiver(post_save, sender=RestaurantMenuItem)
+@receiver(post_delete, sender=RestaurantMenuItem)
+def clear_menu_index(sender, **kwargs):
+    transaction.on_commit(invalidate_menu_index)
+
+
+@receiver(post_save, sender=RestaurantMenuItem)
+@receiver(post_delete, sender=RestaurantMenuItem)
+def update_product_availability(sender, instance, **kwargs):
+    Product.objects.filter(pk__in=instance.get_product_ids()).update_availability()
+
+
+@receiver(post_save, sender=RestaurantMenuItem)
+@receiver(post_delete, sender=RestaurantMenuItem)
+def clear_menu_item_restaurant_menu(sender, instance, **kwargs):
+    clear_restaurant_menus(instance.get_restaurant_ids())
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def clear_restaurant_menu(sender, instance, **kwargs):
+    clear_restaurant_menus([instance.id])
+
+
+@receiver(post_save, sender=Product)
+def clear_product_restaurant_menus(sender, instance, **kwargs):
+    clear_restaurant_menus(
+        RestaurantMenuItem.objects
+        .filter(product=instance)
+        .values_list('restaurant', flat=True)
+    )
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(pre_delete, sender=ProductCategory)
+def clear_category_restaurant_menus(sender, instance, **kwargs):
+    clear_restaurant_menus(
+        RestaurantMenuItem.objects
+        .filter(product__category=instance)
+        .values_list('restaurant', flat=True)
+    )
+
+
+def clear_restaurant_menus(restaurant_ids):
+    restaurant_ids = set(restaurant_ids)
+    if restaurant_ids:
+        transaction.on_commit(lambda: invalidate_restaurant_menus(restaurant_ids))
+
+
+@receiver(post_save, sender=Banner)
+@receiver(post_delete, sender=Banner)
+def clear_banners(sender, **kwargs):
+    transaction.on_commit(invalidate_banners)
+    if settings.BANNERS_STATIC_FILE:
+        transaction.on_commit(write_banners_file)
+
+
+@receiver(post_save, sender=Order)
+def refresh_order_candidates(sender, instance, **kwargs):
+    schedule_candidates_refresh([instance.id])
+
+
+@receiver(post_save, sender=OrderPosition)
+@receiver(post_delete, sender=OrderPosition)
+def refresh_position_candidates(sender, instance, **kwargs):
+    schedule_candidates_refresh([instance.order_id])
+
+
+@receiver(post_save, sender=RestaurantMenuItem)
+@receiver(post_delete, sender=RestaurantMenuItem)
+def refresh_menu_item_candidates(sender, instance, **kwargs):
+    schedule_candidates_refresh(
+        get_open_orders(positions__product__in=instance.get_product_ids()),
+        menu_changed=True,
+    )
+
+
+@receiver(post_delete, sender=Restaurant)
+def clear_restaurants_spatial_index(sender, **kwargs):
+    transaction.on_commit(invalidate_restaurants_spatial_index)
+
+
+@receiver(post_save, sender=Restaurant)
+def refresh_restaurant_candidates(sender, instance, **kwargs):
+    # Name and phone edits don't change which orders the restaurant can take
+    if not instance.is_moved():
+        return
+    transaction.on_commit(invalidate_restaurants_spatial_index)
+    schedule_candidates_refresh(
+        get_orders_near_restaurants(instance.get_addresses()),
+        restaurants_changed=True,
+    )
+
+
+@receiver(post_save, sender=Location)
+def refresh_location_candidates(sender, instance, **kwargs):
+    if instance.latitude is None or instance.longitude is None:
+        return
+    restaurant_addresses = list(
+        Restaurant.objects
+        .filter(normalized_address=instance.normalized_address)
+        .values_list('address', flat=True)
+        .distinct()
+    )
+    if restaurant_addresses:
+        transaction.on_commit(invalidate_restaurants_spatial_index)
+
+    order_ids = set(get_open_orders(normalized_address=instance.normalized_address))
+    if restaurant_addresses:
+        order_ids.update(get_orders_near_restaurants(restaurant_addresses))
+    schedule_candidates_refresh(
+        order_ids, restaurants_changed=bool(restaurant_addresses),
+    )
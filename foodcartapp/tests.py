@@ -0,0 +1,343 @@
+import json
+import os
+import random
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .candidates import get_restaurants_spatial_index, refresh_candidates
+from .catalogue import get_menu_index
+from .models import Banner, Order, OrderPosition, Product, ProductCategory, Restaurant, RestaurantMenuItem
+from geocoder.addresses import normalize_address
+from geocoder.geohash import encode_geohash
+from geocoder.lru import get_locations_cache
+from geocoder.models import Location
+from star_burger import caching
+
+
+PRODUCTS_COUNT = 2000
+RESTAURANTS_COUNT = 200
+MENU_SIZE = 150
+ORDERS_COUNT = 2000
+ORDER_SIZE = 3
+
+
+def seed_catalogue():
+    randomizer = random.Random(0)
+
+    ProductCategory.objects.bulk_create(
+        ProductCategory(name=f'Категория {number}') for number in range(10)
+    )
+    categories = list(ProductCategory.objects.all())
+    Product.objects.bulk_create(
+        (
+            Product(
+                name=f'Товар {number}',
+                category=categories[number % len(categories)],
+                price=100 + number % 500,
+                image=f'product_{number}.jpg',
+            )
+            for number in range(PRODUCTS_COUNT)
+        ),
+        batch_size=500,
+    )
+    Restaurant.objects.bulk_create(
+        Restaurant(
+            name=f'Ресторан {number}',
+            address=f'Москва, ул. Ресторанная, д. {number}',
+            normalized_address=normalize_address(f'Москва, ул. Ресторанная, д. {number}'),
+            contact_phone='+79001234567',
+        )
+        for number in range(RESTAURANTS_COUNT)
+    )
+
+    product_ids = list(Product.objects.values_list('id', flat=True))
+    RestaurantMenuItem.objects.bulk_create(
+        (
+            RestaurantMenuItem(
+                restaurant_id=restaurant_id,
+                product_id=product_id,
+                availability=randomizer.random() < 0.9,
+            )
+            for restaurant_id in Restaurant.objects.values_list('id', flat=True)
+            for product_id in randomizer.sample(product_ids, MENU_SIZE)
+        ),
+        batch_size=1000,
+    )
+    Product.objects.update_availability()
+
+
+def seed_orders():
+    randomizer = random.Random(1)
+
+    Order.objects.bulk_create(
+        (
+            Order(
+                firstname='Иван',
+                lastname=f'Иванов {number}',
+                phonenumber='+79001234567',
+                address=f'Москва, ул. Заказная, д. {number % 500}',
+                normalized_address=normalize_address(f'Москва, ул. Заказная, д. {number % 500}'),
+                status=randomizer.choice(['UNANSWERED', 'EN_ROUTE', 'COMPLETED']),
+            )
+            for number in range(ORDERS_COUNT)
+        ),
+        batch_size=500,
+    )
+
+    product_ids = list(
+        Product.objects.filter(available_anywhere=True).values_list('id', flat=True)
+    )
+    order_ids = list(Order.objects.values_list('id', flat=True))
+    OrderPosition.objects.bulk_create(
+        (
+            OrderPosition(
+                order_id=order_id,
+                product_id=product_id,
+                quantity=2,
+                total_price=200,
+            )
+            for order_id in order_ids
+            for product_id in randomizer.sample(product_ids, ORDER_SIZE)
+        ),
+        batch_size=1000,
+    )
+
+    addresses = set(Restaurant.objects.values_list('address', flat=True))
+    addresses.update(Order.objects.values_list('address', flat=True))
+    locations = []
+    for address in sorted(addresses):
+        latitude = 55.55 + randomizer.random() * 0.4
+        longitude = 37.35 + randomizer.random() * 0.5
+        locations.append(Location(
+            address=address,
+            normalized_address=normalize_address(address),
+            latitude=latitude,
+            longitude=longitude,
+            geohash=encode_geohash(latitude, longitude),
+            status='FOUND',
+        ))
+    Location.objects.bulk_create(locations, batch_size=500)
+
+    refresh_candidates(order_ids)
+
+
+def record_timing(name, queries_count, seconds):
+    """Merge a measurement into the JSON file named by PERF_BASELINE_PATH."""
+    path = os.getenv('PERF_BASELINE_PATH')
+    if not path:
+        return
+
+    baseline = {}
+    if os.path.exists(path):
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+    baseline[name] = {
+        'queries': queries_count,
+        'milliseconds': round(seconds * 1000, 1),
+    }
+    with open(path, 'w') as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+class PerformanceTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalogue()
+        seed_orders()
+        cls.manager = User.objects.create_user(
+            'manager', password='manager', is_staff=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        get_locations_cache().clear()
+
+    def assertQueriesBudget(self, name, max_queries, make_request):
+        # TestCase never commits, so run the on_commit hooks explicitly to
+        # count the work every request triggers after it returns
+        with CaptureQueriesContext(connection) as context:
+            started_at = time.perf_counter()
+            with self.captureOnCommitCallbacks(execute=True):
+                response = make_request()
+                if response.streaming:
+                    content = b''.join(response.streaming_content)
+                else:
+                    content = response.content
+            seconds = time.perf_counter() - started_at
+
+        record_timing(name, len(context.captured_queries), seconds)
+        self.assertLess(response.status_code, 300, content[:500])
+        self.assertLessEqual(
+            len(context.captured_queries), max_queries,
+            '\n'.join(query['sql'] for query in context.captured_queries),
+        )
+        return content
+
+
+class ApiPerformanceTest(PerformanceTestCase):
+    def test_product_list_api(self):
+        content = self.assertQueriesBudget(
+            'product_list_api', 1, lambda: self.client.get('/api/products/'),
+        )
+        self.assertEqual(
+            len(json.loads(content)),
+            Product.objects.filter(available_anywhere=True).count(),
+        )
+        self.assertQueriesBudget(
+            'product_list_api_cached', 0, lambda: self.client.get('/api/products/'),
+        )
+
+    def test_restaurant_menu_api(self):
+        restaurant = Restaurant.objects.first()
+        url = f'/api/restaurants/{restaurant.id}/menu/'
+        content = self.assertQueriesBudget(
+            'restaurant_menu_api', 2, lambda: self.client.get(url),
+        )
+        self.assertEqual(
+            len(json.loads(content)),
+            restaurant.menu_items.filter(availability=True).count(),
+        )
+
+    def test_register_order(self):
+        product_ids = list(
+            RestaurantMenuItem.objects
+            .filter(restaurant=Restaurant.objects.first(), availability=True)
+            .values_list('product', flat=True)[:3]
+        )
+        # Shared indexes are built once per cache lifetime, not per order
+        get_menu_index()
+        get_restaurants_spatial_index()
+
+        payload = {
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79001234567',
+            'address': 'Москва, ул. Заказная, д. 1',
+            'products': [
+                {'product': product_id, 'quantity': 1}
+                for product_id in product_ids
+            ],
+        }
+        self.assertQueriesBudget(
+            'register_order', 13,
+            lambda: self.client.post('/api/order/', payload, content_type='application/json'),
+        )
+        order = Order.objects.latest('id')
+        self.assertEqual(order.positions.count(), len(product_ids))
+        self.assertTrue(order.candidates.exists())
+
+
+class CachingTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.computed = []
+
+    def compute(self):
+        self.computed.append(len(self.computed))
+        return self.computed[-1]
+
+    def test_computes_once(self):
+        self.assertEqual(caching.get_or_compute('menu', 'index', self.compute), 0)
+        self.assertEqual(caching.get_or_compute('menu', 'index', self.compute), 0)
+        self.assertEqual(self.computed, [0])
+
+    def test_invalidate_recomputes_only_its_namespace(self):
+        caching.get_or_compute('menu', 'index', self.compute)
+        caching.get_or_compute('restaurants', 'index', self.compute)
+
+        caching.invalidate('menu')
+
+        self.assertEqual(caching.get_or_compute('menu', 'index', self.compute), 2)
+        self.assertEqual(caching.get_or_compute('restaurants', 'index', self.compute), 1)
+
+    def test_invalidate_survives_evicted_version(self):
+        caching.get_or_compute('menu', 'index', self.compute)
+        cache.delete('menu:version')
+
+        caching.invalidate('menu')
+
+        self.assertEqual(caching.get_or_compute('menu', 'index', self.compute), 1)
+
+    @override_settings(CACHE_TIMEOUT=60)
+    def test_values_expire(self):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            caching.get_or_compute('menu', 'index', self.compute)
+            caching.get_or_compute('menu', 'other', self.compute, timeout=5)
+
+        self.assertEqual(
+            [call.kwargs['timeout'] for call in cache_set.call_args_list],
+            [60, 5],
+        )
+
+
+@mock.patch('foodcartapp.signals.schedule_candidates_refresh')
+@mock.patch('foodcartapp.signals.invalidate_restaurants_spatial_index')
+class RestaurantSignalsTest(TestCase):
+    def setUp(self):
+        Restaurant.objects.create(
+            name='Ресторан', address='Москва, ул. Тверская, д. 1', contact_phone='+79001234567',
+        )
+        self.restaurant = Restaurant.objects.get()
+
+    def test_edit_without_moving_refreshes_nothing(self, invalidate_index, schedule_refresh):
+        self.restaurant.name = 'Ресторан на Тверской'
+        self.restaurant.contact_phone = '+79007654321'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant.save()
+
+        schedule_refresh.assert_not_called()
+        invalidate_index.assert_not_called()
+
+    def test_move_refreshes_both_addresses(self, invalidate_index, schedule_refresh):
+        self.restaurant.address = 'Москва, ул. Тверская, д. 2'
+        with mock.patch('foodcartapp.signals.get_orders_near_restaurants') as get_orders:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.restaurant.save()
+
+        get_orders.assert_called_once_with(
+            {'Москва, ул. Тверская, д. 1', 'Москва, ул. Тверская, д. 2'},
+        )
+        schedule_refresh.assert_called_once()
+        invalidate_index.assert_called_once()
+
+        self.restaurant.contact_phone = '+79007654321'
+        self.restaurant.save()
+        schedule_refresh.assert_called_once()
+
+
+class ImportOrdersTest(TestCase):
+    def test_csv_with_byte_order_mark(self):
+        self.client.force_login(User.objects.create_user('manager', is_staff=True))
+        content = (
+            'firstname,lastname,phonenumber,address,products\n'
+            'Иван,Петров,+79001234567,"Москва, Тверская 1",[]\n'
+        )
+
+        response = self.client.post(
+            '/api/orders/import/', content.encode('utf-8-sig'), content_type='text/csv',
+        )
+
+        errors = response.json()['results'][0]['errors']
+        self.assertNotIn('firstname', errors)
+        self.assertIn('products', errors)
+
+
+class BannerTest(SimpleTestCase):
+    def test_image_url(self):
+        self.assertEqual(Banner(static_image='burger.jpg').get_image_url(), '/static/burger.jpg')
+        self.assertEqual(
+            Banner(image='burger.jpg', static_image='food.jpg').get_image_url(),
+            '/media/burger.jpg',
+        )
+
+    def test_image_is_required(self):
+        with self.assertRaises(ValidationError):
+            Banner(title='Баннер').clean()
@@ -1,95 +1,51 @@
-import requests
+import io
 
 from django.db import transaction, IntegrityError
-from django.http import JsonResponse
-from django.templatetags.static import static
-from rest_framework import status
-from rest_framework.decorators import api_view
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.serializers import ModelSerializer
+from rest_framework.permissions import IsAuthenticated
 
-from .models import Product, Order, OrderPosition, RestaurantMenuItem
-from geocoder.models import Location
-from star_burger.settings import YANDEX_GEOCODE_APIKEY
+from .catalogue import get_banners, get_catalogue, get_restaurant_menu
+from .importing import import_orders, parse_orders
+from .models import Order, OrderPosition, Restaurant
+from .serializers import OrderSerializer
+from geocoder.geocoding import enqueue_location
 
 
-class InvalidAdressError(Exception):
-    """Invalid address was entered"""
-
-
-class OrderPositionSerializer(ModelSerializer):
-    class Meta:
-        model = OrderPosition
-        fields = ['product', 'quantity']
+def banners_list_api(request):
+    return make_payload_response(request, get_banners())
 
 
-class OrderSerializer(ModelSerializer):
-    products = OrderPositionSerializer(
-        many=True, allow_empty=False, write_only=True,
-    )
+def product_list_api(request):
+    return make_payload_response(request, get_catalogue())
 
-    class Meta:
-        model = Order
-        fields = [
-            'id',
-            'firstname',
-            'lastname',
-            'phonenumber',
-            'address',
-            'products',
-        ]
 
+def restaurant_menu_api(request, restaurant_id):
+    try:
+        payload = get_restaurant_menu(restaurant_id)
+    except Restaurant.DoesNotExist:
+        raise Http404('Ресторан не найден')
+    return make_payload_response(request, payload)
 
-def banners_list_api(request):
-    # FIXME move data to db?
-    return JsonResponse([
-        {
-            'title': 'Burger',
-            'src': static('burger.jpg'),
-            'text': 'Tasty Burger at your door step',
-        },
-        {
-            'title': 'Spices',
-            'src': static('food.jpg'),
-            'text': 'All Cuisines',
-        },
-        {
-            'title': 'New York',
-            'src': static('tasty.jpg'),
-            'text': 'Food is incomplete without a tasty dessert',
-        }
-    ], safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
 
+def make_payload_response(request, payload):
+    response = get_conditional_response(
+        request,
+        etag=payload['etag'],
+        last_modified=payload['last_modified'],
+    )
+    if response is None:
+        response = HttpResponse(
+            payload['content'], content_type='application/json',
+        )
 
-def product_list_api(request):
-    products = Product.objects.select_related('category').available()
-
-    dumped_products = []
-    for product in products:
-        dumped_product = {
-            'id': product.id,
-            'name': product.name,
-            'price': product.price,
-            'special_status': product.special_status,
-            'description': product.description,
-            'category': {
-                'id': product.category.id,
-                'name': product.category.name,
-            },
-            'image': product.image.url,
-            'restaurant': {
-                'id': product.id,
-                'name': product.name,
-            }
-        }
-        dumped_products.append(dumped_product)
-    return JsonResponse(dumped_products, safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    response['ETag'] = payload['etag']
+    response['Last-Modified'] = http_date(payload['last_modified'])
+    patch_cache_control(response, no_cache=True)
+    return response
 
 
 @api_view(['POST'])
@@ -114,55 +70,22 @@ def register_order(request):
     for position in positions:
         position.total_price = position.calculate_actual_price()
 
-    try:
-        create_location(valid_data['address'])
-    except InvalidAdressError:
-        transaction.set_rollback(True)
-        return Response('Invalid address', status=status.HTTP_400_BAD_REQUEST)
-
+    enqueue_location(valid_data['address'])
     OrderPosition.objects.bulk_create(positions)
 
     return Response(OrderSerializer(order).data)
 
 
-def choose_restaurant(products, order):
-    products_restaurants = []
-    for product in products:
-        restaurants = [
-            item.restaurant for item in
-            RestaurantMenuItem.objects.filter(product__exact=product)
-        ]
-        products_restaurants.append(set(restaurants))
-    first_restaurant, *others_restaurants = products_restaurants
-    suitable_restaurants = first_restaurant.intersection(*others_restaurants)
-
-    order.restaurant.set(suitable_restaurants)
-    order.save()
-
-
-def create_location(address):
-    location, created = Location.objects.get_or_create(address=address)
-    if not created:
-        return None
-    latitude, longitude = fetch_coordinates(address)
-    location.latitude = latitude
-    location.longitude = longitude
-    location.save()
-
-
-def fetch_coordinates(place):
-    base_url = 'https://geocode-maps.yandex.ru/1.x'
-    payload = {
-        'geocode': place, 'apikey': YANDEX_GEOCODE_APIKEY, 'format': 'json'
-    }
-
-    response = requests.get(base_url, params=payload)
-    response.raise_for_status()
-
-    found_places = response.json()['response']['GeoObjectCollection']['featureMember']
-    try:
-        most_relevant = found_places[0]
-    except IndexError:
-        raise InvalidAdressError('Address is not found')
-    lon, lat = most_relevant['GeoObject']['Point']['pos'].split(' ')
-    return lat, lon
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_orders_api(request):
+    content_type = request.content_type.split(';')[0].strip()
+    file_format = 'csv' if content_type == 'text/csv' else 'jsonl'
+    stream = io.StringIO(request.body.decode('utf-8-sig'))
+
+    results = import_orders(parse_orders(stream, file_format))
+    return Response({
+        'created': sum('id' in result for result in results),
+        'failed': sum('errors' in result for result in results),
+        'results': results,
+    })
@@ -0,0 +1,30 @@
+import re
+import unicodedata
+
+
+ABBREVIATIONS = {
+    'г': 'город',
+    'ул': 'улица',
+    'пр-т': 'проспект',
+    'просп': 'проспект',
+    'пер': 'переулок',
+    'пл': 'площадь',
+    'наб': 'набережная',
+    'ш': 'шоссе',
+    'б-р': 'бульвар',
+    'бул': 'бульвар',
+    'д': 'дом',
+    'к': 'корпус',
+    'корп': 'корпус',
+    'стр': 'строение',
+}
+
+TOKEN_PATTERN = re.compile(r'\w+(?:-\w+)*')
+
+
+def normalize_address(address):
+    address = unicodedata.normalize('NFKC', address).casefold().replace('ё', 'е')
+    return ' '.join(
+        ABBREVIATIONS.get(token, token)
+        for token in TOKEN_PATTERN.findall(address)
+    )
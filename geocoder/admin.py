@@ -5,4 +5,4 @@ from .models import Location
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
-    pass
+    readonly_fields = ['normalized_address']
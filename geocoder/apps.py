@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GeocoderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'geocoder'
+
+    def ready(self):
+        from . import signals  # noqa: F401
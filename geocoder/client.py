@@ -0,0 +1,185 @@
+import hashlib
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+
+# Network failures and responses of an unexpected shape are both treated
+# as a failed request: retried, counted and reported to the breaker
+FETCH_ERRORS = (requests.RequestException, ValueError, KeyError, IndexError)
+
+
+class InvalidAdressError(Exception):
+    """Invalid address was entered"""
+
+
+class GeocoderUnavailableError(Exception):
+    """Geocoder is failing, requests are not sent until it recovers"""
+
+
+class YandexBackend:
+    base_url = 'https://geocode-maps.yandex.ru/1.x'
+
+    def __init__(self, apikey=None, pool_size=None):
+        self.apikey = apikey or settings.YANDEX_GEOCODE_APIKEY
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size or settings.GEOCODER_WORKERS)
+        self.session.mount('https://', adapter)
+
+    def fetch_coordinates(self, place, timeout):
+        payload = {'geocode': place, 'apikey': self.apikey, 'format': 'json'}
+
+        response = self.session.get(self.base_url, params=payload, timeout=timeout)
+        response.raise_for_status()
+
+        found_places = response.json()['response']['GeoObjectCollection']['featureMember']
+        try:
+            most_relevant = found_places[0]
+        except IndexError:
+            raise InvalidAdressError('Address is not found')
+        lon, lat = most_relevant['GeoObject']['Point']['pos'].split(' ')
+        return float(lat), float(lon)
+
+
+class FakeBackend:
+    """Offline backend for development and tests.
+
+    Known places are taken from `places`; any other address gets stable
+    made-up coordinates around Moscow unless `strict` is set.
+    """
+
+    def __init__(self, places=None, strict=False, error=None):
+        self.places = places or {}
+        self.strict = strict
+        self.error = error
+        self.requested_places = []
+
+    def fetch_coordinates(self, place, timeout):
+        self.requested_places.append(place)
+        if self.error:
+            raise self.error
+        if place in self.places:
+            return self.places[place]
+        if self.strict:
+            raise InvalidAdressError('Address is not found')
+
+        digest = hashlib.md5(place.encode()).digest()
+        return 55.55 + digest[0] / 255 * 0.4, 37.35 + digest[1] / 255 * 0.5
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let requests through, one failure opens it again
+                self.opened_at = None
+                self.failures = self.failure_threshold - 1
+                return False
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class GeocoderClient:
+    def __init__(self, backend, timeout, retries, backoff, breaker):
+        self.backend = backend
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker
+        self.stats = {
+            'requests': 0,
+            'found': 0,
+            'not_found': 0,
+            'errors': 0,
+            'retries': 0,
+            'rejected': 0,
+            'latency': 0.0,
+        }
+        self.stats_lock = threading.Lock()
+
+    def fetch_coordinates(self, place):
+        for attempt in range(self.retries + 1):
+            if self.breaker.is_open:
+                self.count('rejected')
+                raise GeocoderUnavailableError('Geocoder circuit is open')
+            if attempt:
+                self.count('retries')
+                time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+            started_at = time.monotonic()
+            try:
+                coordinates = self.backend.fetch_coordinates(place, self.timeout)
+            except InvalidAdressError:
+                self.breaker.record_success()
+                self.count('not_found', started_at)
+                raise
+            except FETCH_ERRORS:
+                self.breaker.record_failure()
+                self.count('errors', started_at)
+                if attempt == self.retries:
+                    raise
+            else:
+                self.breaker.record_success()
+                self.count('found', started_at)
+                return coordinates
+
+    def count(self, counter, started_at=None):
+        with self.stats_lock:
+            self.stats[counter] += 1
+            if started_at is not None:
+                self.stats['requests'] += 1
+                self.stats['latency'] += time.monotonic() - started_at
+
+    def get_stats(self):
+        with self.stats_lock:
+            stats = dict(self.stats)
+        requests_count = stats['requests']
+        stats['average_latency'] = stats['latency'] / requests_count if requests_count else 0
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_geocoder_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            backend_class = import_string(settings.GEOCODER_BACKEND)
+            _client = GeocoderClient(
+                backend=backend_class(),
+                timeout=(settings.GEOCODER_CONNECT_TIMEOUT, settings.GEOCODER_READ_TIMEOUT),
+                retries=settings.GEOCODER_RETRIES,
+                backoff=settings.GEOCODER_RETRY_BACKOFF,
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.GEOCODER_BREAKER_THRESHOLD,
+                    reset_timeout=settings.GEOCODER_BREAKER_RESET_TIMEOUT,
+                ),
+            )
+        return _client
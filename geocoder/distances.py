@@ -0,0 +1,34 @@
+import numpy as np
+from geopy import distance
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def get_distance_matrix(origins, destinations, exact=False):
+    """Return a km matrix of distances from every origin to every destination.
+
+    Points are (latitude, longitude) pairs. By default the haversine formula
+    is computed for all pairs at once; `exact=True` solves the geodesic for
+    every pair with geopy instead, which is slow and meant for audits.
+    """
+    if exact:
+        return np.array([
+            [distance.distance(origin, destination).km for destination in destinations]
+            for origin in origins
+        ]).reshape(len(origins), len(destinations))
+
+    origins = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+    destinations = np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+
+    origin_lat = origins[:, 0, np.newaxis]
+    origin_lon = origins[:, 1, np.newaxis]
+    destination_lat = destinations[np.newaxis, :, 0]
+    destination_lon = destinations[np.newaxis, :, 1]
+
+    haversine = (
+        np.sin((destination_lat - origin_lat) / 2) ** 2
+        + np.cos(origin_lat) * np.cos(destination_lat)
+        * np.sin((destination_lon - origin_lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
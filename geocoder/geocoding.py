@@ -0,0 +1,123 @@
+import copy
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .addresses import normalize_address
+from .client import FETCH_ERRORS, GeocoderUnavailableError, InvalidAdressError, get_geocoder_client
+from .lru import get_locations_cache
+from .models import Location
+
+
+logger = logging.getLogger(__name__)
+
+background_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def enqueue_location(address):
+    normalized_address = normalize_address(address)
+    cached_location = get_locations_cache().get(normalized_address)
+    if cached_location is not None and not cached_location.is_stale():
+        return copy.copy(cached_location)
+
+    location, created = Location.objects.get_or_create(
+        normalized_address=normalized_address,
+        defaults={'address': address},
+    )
+    if not created and location.is_stale():
+        location.status = 'PENDING'
+        location.attempts = 0
+        location.save()
+    # Cache the row as it is at commit time, not a rolled back version
+    transaction.on_commit(
+        lambda: get_locations_cache().set(normalized_address, copy.copy(location))
+    )
+    return location
+
+
+def enqueue_locations(addresses):
+    addresses_by_key = {}
+    for address in addresses:
+        addresses_by_key.setdefault(normalize_address(address), address)
+
+    Location.objects.bulk_create(
+        [
+            Location(address=address, normalized_address=normalized_address)
+            for normalized_address, address in addresses_by_key.items()
+        ],
+        ignore_conflicts=True,
+    )
+    mark_for_refresh(
+        Location.objects.filter(normalized_address__in=addresses_by_key).stale()
+    )
+
+
+def mark_for_refresh(locations):
+    return locations.update(status='PENDING', attempts=0)
+
+
+def schedule_location_geocoding(address):
+    location = enqueue_location(address)
+    if location.status == 'PENDING':
+        transaction.on_commit(
+            lambda: background_executor.submit(geocode_pending_location, location.id)
+        )
+    return location
+
+
+def geocode_pending_location(location_id):
+    try:
+        locations = list(Location.objects.filter(id=location_id, status='PENDING'))
+        geocode_locations(locations)
+    finally:
+        connection.close()
+
+
+def geocode_pending_locations(batch_size):
+    locations = list(
+        Location.objects
+        .filter(status='PENDING')
+        .order_by('request_date')[:batch_size]
+    )
+    geocode_locations(locations)
+    return locations
+
+
+def geocode_locations(locations):
+    with ThreadPoolExecutor(settings.GEOCODER_WORKERS) as executor:
+        results = executor.map(try_fetch_coordinates, locations)
+        for location, (coordinates, error) in zip(locations, results):
+            update_location(location, coordinates, error)
+
+
+def try_fetch_coordinates(location):
+    client = get_geocoder_client()
+    try:
+        return client.fetch_coordinates(location.address), None
+    except (InvalidAdressError, GeocoderUnavailableError, *FETCH_ERRORS) as error:
+        return None, error
+    except Exception as error:
+        # A single bad address must not stop the whole worker
+        logger.exception('Failed to geocode %r', location.address)
+        return None, error
+
+
+def update_location(location, coordinates, error):
+    if isinstance(error, GeocoderUnavailableError):
+        return
+
+    location.request_date = timezone.now()
+    location.attempts += 1
+
+    if coordinates:
+        location.latitude, location.longitude = coordinates
+        location.status = 'FOUND'
+    elif isinstance(error, InvalidAdressError):
+        location.status = 'NOT_FOUND'
+    elif location.attempts >= settings.GEOCODER_MAX_ATTEMPTS:
+        location.status = 'FAILED'
+
+    location.save()
@@ -0,0 +1,75 @@
+import math
+
+from .distances import EARTH_RADIUS_KM
+
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+
+    geohash = []
+    bits = 0
+    bits_count = 0
+    is_longitude_bit = True
+    while len(geohash) < precision:
+        value, value_range = (
+            (longitude, longitude_range) if is_longitude_bit
+            else (latitude, latitude_range)
+        )
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits = bits << 1 | 1
+            value_range[0] = middle
+        else:
+            bits = bits << 1
+            value_range[1] = middle
+        is_longitude_bit = not is_longitude_bit
+
+        bits_count += 1
+        if bits_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bits_count = 0
+
+    return ''.join(geohash)
+
+
+def get_cell_size(precision):
+    """Return (height, width) of a cell in degrees."""
+    bits = 5 * precision
+    latitude_bits = bits // 2
+    longitude_bits = bits - latitude_bits
+    return 180 / 2 ** latitude_bits, 360 / 2 ** longitude_bits
+
+
+def get_covering_cells(latitude, longitude, km):
+    """Return geohash prefixes whose cells cover the circle around the point.
+
+    The precision is the finest at which a cell is at least `km` across,
+    so the cell of the point and its eight neighbours are enough.
+    """
+    latitude_scale = KM_PER_DEGREE
+    longitude_scale = KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6)
+
+    precision = 0
+    while precision < GEOHASH_PRECISION:
+        height, width = get_cell_size(precision + 1)
+        if height * latitude_scale < km or width * longitude_scale < km:
+            break
+        precision += 1
+    if not precision:
+        return ['']
+
+    height, width = get_cell_size(precision)
+    cells = set()
+    for latitude_step in (-1, 0, 1):
+        for longitude_step in (-1, 0, 1):
+            cell_latitude = min(max(latitude + latitude_step * height, -90), 90)
+            cell_longitude = (longitude + longitude_step * width + 180) % 360 - 180
+            cells.add(encode_geohash(cell_latitude, cell_longitude, precision))
+    return sorted(cells)
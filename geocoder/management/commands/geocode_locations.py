@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from geocoder.client import get_geocoder_client
+from geocoder.geocoding import geocode_pending_locations
+
+
+class Command(BaseCommand):
+    help = 'Геокодирует адреса, ожидающие координат'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='пауза между опросами очереди, в секундах',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='обработать очередь один раз и выйти',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                locations = geocode_pending_locations(options['batch_size'])
+            except Exception as error:
+                if options['once']:
+                    raise
+                self.stderr.write(f'Ошибка при геокодировании: {error!r}')
+                time.sleep(options['interval'])
+                continue
+            for location in locations:
+                self.stdout.write(f'{location.address}: {location.status}')
+            if locations and options['verbosity'] > 1:
+                self.stdout.write(str(get_geocoder_client().get_stats()))
+
+            if options['once']:
+                return
+            if len(locations) < options['batch_size'] or get_geocoder_client().breaker.is_open:
+                time.sleep(options['interval'])
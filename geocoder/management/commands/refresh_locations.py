@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from geocoder.geocoding import geocode_locations, mark_for_refresh
+from geocoder.models import Location
+
+
+class Command(BaseCommand):
+    help = 'Заново геокодирует устаревшие и пустые адреса'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument(
+            '--rate', type=float, default=5,
+            help='не больше стольких запросов к геокодеру в секунду',
+        )
+        parser.add_argument(
+            '--limit', type=int,
+            help='обработать не больше стольких адресов',
+        )
+
+    def handle(self, *args, **options):
+        location_ids = list(
+            Location.objects
+            .filter(
+                Q(id__in=Location.objects.stale())
+                | Q(status='PENDING')
+            )
+            .order_by('request_date')
+            .values_list('id', flat=True)[:options['limit']]
+        )
+
+        batch_size = options['batch_size']
+        batch_duration = batch_size / options['rate']
+        for batch_start in range(0, len(location_ids), batch_size):
+            started_at = time.monotonic()
+
+            batch_ids = location_ids[batch_start:batch_start + batch_size]
+            mark_for_refresh(Location.objects.filter(id__in=batch_ids))
+            locations = list(Location.objects.filter(id__in=batch_ids))
+            geocode_locations(locations)
+            for location in locations:
+                self.stdout.write(f'{location.address}: {location.status}')
+
+            time.sleep(max(0, batch_duration - (time.monotonic() - started_at)))
+
+        self.stdout.write(f'Обработано адресов: {len(location_ids)}')
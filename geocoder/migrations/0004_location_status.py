@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+def mark_geocoded_locations(apps, schema_editor):
+    Location = apps.get_model('geocoder', 'Location')
+    (
+        Location.objects
+        .exclude(latitude=None)
+        .exclude(longitude=None)
+        .update(status='FOUND', attempts=1)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geocoder', '0003_auto_20210822_0945'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='число запросов к геокодеру'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Ожидает геокодирования'), ('FOUND', 'Найдено'), ('NOT_FOUND', 'Не найдено'), ('FAILED', 'Ошибка геокодера')], db_index=True, default='PENDING', max_length=10, verbose_name='статус геокодирования'),
+        ),
+        migrations.RunPython(
+            mark_geocoded_locations, migrations.RunPython.noop,
+        ),
+    ]
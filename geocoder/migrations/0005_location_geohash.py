@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-18 17:39
+
+from django.db import migrations, models
+
+from geocoder.geohash import encode_geohash
+
+
+def fill_geohashes(apps, schema_editor):
+    Location = apps.get_model('geocoder', 'Location')
+    locations = list(
+        Location.objects
+        .exclude(latitude=None)
+        .exclude(longitude=None)
+        .only('latitude', 'longitude')
+    )
+    for location in locations:
+        location.geohash = encode_geohash(location.latitude, location.longitude)
+    Location.objects.bulk_update(locations, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geocoder', '0004_location_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, max_length=12, verbose_name='геохэш'),
+        ),
+        migrations.RunPython(fill_geohashes, migrations.RunPython.noop),
+    ]
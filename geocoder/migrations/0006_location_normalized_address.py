@@ -0,0 +1,48 @@
+# Generated by Django 3.2 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+from geocoder.addresses import normalize_address
+
+
+STATUS_PRIORITY = ['FOUND', 'PENDING', 'NOT_FOUND', 'FAILED']
+
+
+def merge_duplicate_locations(apps, schema_editor):
+    Location = apps.get_model('geocoder', 'Location')
+
+    locations_by_key = {}
+    for location in Location.objects.order_by('-request_date'):
+        location.normalized_address = normalize_address(location.address)
+        locations_by_key.setdefault(location.normalized_address, []).append(location)
+
+    kept_locations = []
+    duplicate_ids = []
+    for locations in locations_by_key.values():
+        locations.sort(key=lambda location: STATUS_PRIORITY.index(location.status))
+        kept_locations.append(locations[0])
+        duplicate_ids.extend(location.id for location in locations[1:])
+
+    Location.objects.filter(id__in=duplicate_ids).delete()
+    Location.objects.bulk_update(kept_locations, ['normalized_address'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geocoder', '0005_location_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='normalized_address',
+            field=models.CharField(max_length=200, null=True, verbose_name='нормализованный адрес'),
+        ),
+        migrations.RunPython(merge_duplicate_locations, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='location',
+            name='normalized_address',
+            field=models.CharField(max_length=200, unique=True, verbose_name='нормализованный адрес'),
+        ),
+    ]
@@ -1,13 +1,88 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from .addresses import normalize_address
+from .geohash import GEOHASH_PRECISION, encode_geohash, get_covering_cells
+from .distances import get_distance_matrix
+
+
+class LocationQuerySet(models.QuerySet):
+    def get_coordinates(self, addresses):
+        addresses = set(addresses)
+        addresses_by_key = {}
+        for address in addresses:
+            addresses_by_key.setdefault(normalize_address(address), []).append(address)
+
+        locations = (
+            self.filter(normalized_address__in=addresses_by_key)
+            .values_list('normalized_address', 'latitude', 'longitude', 'status')
+        )
+
+        coordinates = {}
+        missing_addresses = dict.fromkeys(addresses)
+        for normalized_address, latitude, longitude, status in locations:
+            for address in addresses_by_key[normalized_address]:
+                if latitude is None or longitude is None:
+                    missing_addresses[address] = status
+                else:
+                    coordinates[address] = (latitude, longitude)
+                    del missing_addresses[address]
+        return coordinates, missing_addresses
+
+    def stale(self):
+        negative_ttl, refresh_age = get_geocoding_ttls()
+        now = timezone.now()
+        return self.filter(
+            models.Q(
+                status__in=['NOT_FOUND', 'FAILED'],
+                request_date__lt=now - negative_ttl,
+            )
+            | models.Q(status='FOUND', request_date__lt=now - refresh_age)
+        )
+
+    def near(self, latitude, longitude, km):
+        cells_filter = models.Q()
+        for cell in get_covering_cells(latitude, longitude, km):
+            cells_filter |= models.Q(geohash__startswith=cell)
+
+        locations = list(
+            self.filter(cells_filter)
+            .exclude(latitude=None)
+            .exclude(longitude=None)
+        )
+        distances = get_distance_matrix(
+            [(latitude, longitude)],
+            [(location.latitude, location.longitude) for location in locations],
+        )[0].tolist()
+
+        nearby_locations = []
+        for location, distance in zip(locations, distances):
+            if distance <= km:
+                location.distance = distance
+                nearby_locations.append(location)
+        return sorted(nearby_locations, key=lambda location: location.distance)
+
 
 class Location(models.Model):
+    STATUS = (
+        ('PENDING', 'Ожидает геокодирования'),
+        ('FOUND', 'Найдено'),
+        ('NOT_FOUND', 'Не найдено'),
+        ('FAILED', 'Ошибка геокодера'),
+    )
     address = models.CharField(
         'адрес',
         max_length=100,
         unique=True,
     )
+    normalized_address = models.CharField(
+        'нормализованный адрес',
+        max_length=200,
+        unique=True,
+    )
     latitude = models.FloatField(
         'широта',
         null=True,
@@ -23,6 +98,25 @@ class Location(models.Model):
         default=timezone.now,
         db_index=True,
     )
+    status = models.CharField(
+        'статус геокодирования',
+        max_length=10,
+        choices=STATUS,
+        default='PENDING',
+        db_index=True,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'число запросов к геокодеру',
+        default=0,
+    )
+    geohash = models.CharField(
+        'геохэш',
+        max_length=GEOHASH_PRECISION,
+        blank=True,
+        db_index=True,
+    )
+
+    objects = LocationQuerySet.as_manager()
 
     class Meta():
         verbose_name = 'место'
@@ -30,3 +124,27 @@ class Location(models.Model):
 
     def __str__(self):
         return self.address
+
+    def is_stale(self):
+        negative_ttl, refresh_age = get_geocoding_ttls()
+        age = timezone.now() - self.request_date
+        if self.status in ['NOT_FOUND', 'FAILED']:
+            return age > negative_ttl
+        if self.status == 'FOUND':
+            return age > refresh_age
+        return False
+
+    def save(self, *args, **kwargs):
+        self.normalized_address = normalize_address(self.address)
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ''
+        else:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
+
+def get_geocoding_ttls():
+    return (
+        timedelta(hours=settings.GEOCODER_NEGATIVE_TTL_HOURS),
+        timedelta(days=settings.GEOCODER_REFRESH_AFTER_DAYS),
+    )
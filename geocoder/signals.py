@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .lru import get_locations_cache
+from .models import Location
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def clear_cached_location(sender, instance, **kwargs):
+    get_locations_cache().delete(instance.normalized_address)
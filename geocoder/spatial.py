@@ -0,0 +1,95 @@
+import heapq
+import math
+
+from .distances import EARTH_RADIUS_KM
+
+
+class SpatialIndex:
+    """KD-tree over points on the Earth's surface.
+
+    Points are stored as unit vectors, where the straight-line (chord)
+    distance grows with the great-circle distance, so the tree can prune
+    by plain coordinate differences.
+    """
+
+    def __init__(self, points):
+        nodes = [
+            (to_unit_vector(latitude, longitude), key)
+            for key, (latitude, longitude) in points.items()
+        ]
+        self.size = len(nodes)
+        self.root = self.build(nodes, depth=0)
+
+    def build(self, nodes, depth):
+        if not nodes:
+            return None
+        axis = depth % 3
+        nodes.sort(key=lambda node: node[0][axis])
+        median = len(nodes) // 2
+        vector, key = nodes[median]
+        return (
+            vector,
+            key,
+            axis,
+            self.build(nodes[:median], depth + 1),
+            self.build(nodes[median + 1:], depth + 1),
+        )
+
+    def nearest(self, latitude, longitude, k=None, radius_km=None, keys=None):
+        """Return up to `k` (key, km) pairs nearest to the point, closest first.
+
+        Only points within `radius_km` and, if given, with keys from `keys`
+        are considered. Without `k` every matching point is returned.
+        """
+        target = to_unit_vector(latitude, longitude)
+        max_chord = math.inf if radius_km is None else to_chord(radius_km)
+        if keys is not None:
+            keys = set(keys)
+
+        found = []  # max-heap of (-chord, key)
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            vector, key, axis, left, right = node
+
+            bound = max_chord
+            if k and len(found) == k:
+                bound = min(bound, -found[0][0])
+
+            chord = math.dist(vector, target)
+            if chord <= bound and (keys is None or key in keys):
+                heapq.heappush(found, (-chord, key))
+                if k and len(found) > k:
+                    heapq.heappop(found)
+                if k and len(found) == k:
+                    bound = min(bound, -found[0][0])
+
+            offset = target[axis] - vector[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            if abs(offset) <= bound:
+                stack.append(far)
+            stack.append(near)
+
+        return [
+            (key, to_km(-negative_chord))
+            for negative_chord, key in sorted(found, reverse=True)
+        ]
+
+
+def to_unit_vector(latitude, longitude):
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    return (
+        math.cos(latitude) * math.cos(longitude),
+        math.cos(latitude) * math.sin(longitude),
+        math.sin(latitude),
+    )
+
+
+def to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1))
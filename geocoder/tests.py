@@ -1,3 +1,337 @@
-from django.test import TestCase
+import math
+import random
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.test import SimpleTestCase, TestCase
+
+from .addresses import normalize_address
+from .client import CircuitBreaker, FakeBackend, GeocoderClient, GeocoderUnavailableError, InvalidAdressError
+from .distances import get_distance_matrix
+from .geohash import encode_geohash, get_covering_cells
+from .lru import LRUCache
+from .models import Location
+from .spatial import SpatialIndex
+
+
+def make_client(backend, retries=0, failure_threshold=3, reset_timeout=30):
+    return GeocoderClient(
+        backend=backend,
+        timeout=1,
+        retries=retries,
+        backoff=0,
+        breaker=CircuitBreaker(failure_threshold, reset_timeout),
+    )
+
+
+class FakeBackendTest(SimpleTestCase):
+    def test_known_places(self):
+        backend = FakeBackend(places={'Красная площадь': (55.75, 37.62)})
+        self.assertEqual(backend.fetch_coordinates('Красная площадь', 1), (55.75, 37.62))
+        self.assertEqual(backend.requested_places, ['Красная площадь'])
+
+    def test_unknown_places_get_stable_coordinates(self):
+        backend = FakeBackend()
+        self.assertEqual(
+            backend.fetch_coordinates('Тверская 1', 1),
+            backend.fetch_coordinates('Тверская 1', 1),
+        )
+
+    def test_strict_backend_does_not_find_unknown_places(self):
+        with self.assertRaises(InvalidAdressError):
+            FakeBackend(strict=True).fetch_coordinates('Тверская 1', 1)
+
+
+class GeocoderClientTest(SimpleTestCase):
+    def test_retries_network_errors(self):
+        backend = FakeBackend(error=requests.ConnectionError())
+        client = make_client(backend, retries=2)
+
+        with self.assertRaises(requests.ConnectionError):
+            client.fetch_coordinates('Тверская 1')
+
+        self.assertEqual(len(backend.requested_places), 3)
+        stats = client.get_stats()
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['errors'], 3)
+
+    def test_counts_malformed_responses_as_errors(self):
+        backend = FakeBackend(error=ValueError('No JSON object could be decoded'))
+        client = make_client(backend, retries=1)
+
+        with self.assertRaises(ValueError):
+            client.fetch_coordinates('Тверская 1')
+
+        self.assertEqual(len(backend.requested_places), 2)
+        self.assertEqual(client.get_stats()['errors'], 2)
+
+    def test_does_not_retry_unknown_addresses(self):
+        backend = FakeBackend(strict=True)
+        client = make_client(backend, retries=2)
+
+        with self.assertRaises(InvalidAdressError):
+            client.fetch_coordinates('Тверская 1')
+
+        self.assertEqual(len(backend.requested_places), 1)
+        self.assertFalse(client.breaker.is_open)
+
+
+@mock.patch('geocoder.client.time.monotonic')
+class CircuitBreakerTest(SimpleTestCase):
+    def test_opens_after_consecutive_failures(self, monotonic):
+        monotonic.return_value = 100
+        backend = FakeBackend(error=requests.Timeout())
+        client = make_client(backend, failure_threshold=2)
+
+        for _ in range(2):
+            with self.assertRaises(requests.Timeout):
+                client.fetch_coordinates('Тверская 1')
+        self.assertTrue(client.breaker.is_open)
+
+        with self.assertRaises(GeocoderUnavailableError):
+            client.fetch_coordinates('Тверская 1')
+        self.assertEqual(len(backend.requested_places), 2)
+        self.assertEqual(client.get_stats()['rejected'], 1)
+
+    def test_half_open_failure_opens_again(self, monotonic):
+        monotonic.return_value = 100
+        backend = FakeBackend(error=requests.Timeout())
+        client = make_client(backend, failure_threshold=2, reset_timeout=30)
+        for _ in range(2):
+            with self.assertRaises(requests.Timeout):
+                client.fetch_coordinates('Тверская 1')
+
+        monotonic.return_value = 131
+        self.assertFalse(client.breaker.is_open)
+        with self.assertRaises(requests.Timeout):
+            client.fetch_coordinates('Тверская 1')
+        self.assertTrue(client.breaker.is_open)
+
+    def test_half_open_success_closes(self, monotonic):
+        monotonic.return_value = 100
+        backend = FakeBackend(error=requests.Timeout())
+        client = make_client(backend, failure_threshold=2, reset_timeout=30)
+        for _ in range(2):
+            with self.assertRaises(requests.Timeout):
+                client.fetch_coordinates('Тверская 1')
+
+        monotonic.return_value = 131
+        backend.error = None
+        client.fetch_coordinates('Тверская 1')
+
+        backend.error = requests.Timeout()
+        with self.assertRaises(requests.Timeout):
+            client.fetch_coordinates('Тверская 1')
+        self.assertFalse(client.breaker.is_open)
+
+
+class SpatialIndexTest(SimpleTestCase):
+    def setUp(self):
+        randomizer = random.Random(0)
+        self.points = {
+            number: (55.55 + randomizer.random() * 0.4, 37.35 + randomizer.random() * 0.5)
+            for number in range(300)
+        }
+        # A few points far away and across the antimeridian
+        self.points.update({
+            'Владивосток': (43.12, 131.89),
+            'Анадырь': (64.73, 177.51),
+            'Ном': (64.5, -165.41),
+        })
+        self.targets = [
+            (55.55 + randomizer.random() * 0.4, 37.35 + randomizer.random() * 0.5)
+            for _ in range(20)
+        ]
+        self.targets.append((65.0, 179.99))
+        self.index = SpatialIndex(self.points)
+
+    def get_brute_force_nearest(self, latitude, longitude, radius_km=None, keys=None):
+        keys = list(self.points) if keys is None else list(keys)
+        distances = get_distance_matrix(
+            [(latitude, longitude)], [self.points[key] for key in keys],
+        )[0]
+        return sorted(
+            (
+                (key, km) for key, km in zip(keys, distances)
+                if radius_km is None or km <= radius_km
+            ),
+            key=lambda pair: pair[1],
+        )
+
+    def assertSameNearest(self, found, expected):
+        self.assertEqual([key for key, _ in found], [key for key, _ in expected])
+        for (_, km), (_, expected_km) in zip(found, expected):
+            self.assertAlmostEqual(km, expected_km, places=6)
+
+    def test_k_nearest(self):
+        for latitude, longitude in self.targets:
+            self.assertSameNearest(
+                self.index.nearest(latitude, longitude, k=5),
+                self.get_brute_force_nearest(latitude, longitude)[:5],
+            )
+
+    def test_radius(self):
+        for latitude, longitude in self.targets:
+            self.assertSameNearest(
+                self.index.nearest(latitude, longitude, radius_km=3),
+                self.get_brute_force_nearest(latitude, longitude, radius_km=3),
+            )
+
+    def test_keys(self):
+        keys = [key for key in self.points if isinstance(key, str) or key % 7 == 0]
+        for latitude, longitude in self.targets:
+            self.assertSameNearest(
+                self.index.nearest(latitude, longitude, k=3, radius_km=20, keys=keys),
+                self.get_brute_force_nearest(latitude, longitude, radius_km=20, keys=keys)[:3],
+            )
+
+    def test_all_points(self):
+        latitude, longitude = self.targets[0]
+        self.assertSameNearest(
+            self.index.nearest(latitude, longitude),
+            self.get_brute_force_nearest(latitude, longitude),
+        )
+
+    def test_empty_index(self):
+        self.assertEqual(SpatialIndex({}).nearest(55.75, 37.62, k=3), [])
+
+
+class GeohashTest(SimpleTestCase):
+    def test_encode(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(encode_geohash(42.6, -5.6, 5), 'ezs42')
+
+    def test_covering_cells_contain_every_point_within_radius(self):
+        randomizer = random.Random(0)
+        for _ in range(500):
+            latitude = randomizer.uniform(-80, 80)
+            longitude = randomizer.uniform(-180, 180)
+            km = randomizer.choice([0.5, 2, 5, 10, 50, 300])
+            cells = get_covering_cells(latitude, longitude, km)
+
+            # Sample the bounding box of the circle and keep the points inside it
+            latitude_delta = km / 111
+            longitude_delta = latitude_delta / math.cos(math.radians(abs(latitude) + latitude_delta))
+            points = [
+                (
+                    latitude + randomizer.uniform(-latitude_delta, latitude_delta),
+                    (longitude + randomizer.uniform(-longitude_delta, longitude_delta) + 180) % 360 - 180,
+                )
+                for _ in range(50)
+            ]
+            distances = get_distance_matrix([(latitude, longitude)], points)[0]
+            for point, point_km in zip(points, distances):
+                if point_km <= km:
+                    geohash = encode_geohash(*point)
+                    self.assertTrue(
+                        any(geohash.startswith(cell) for cell in cells),
+                        f'{point} is {point_km:.3f} km from {(latitude, longitude)}, outside {cells}',
+                    )
+
+    def test_huge_radius_covers_everything(self):
+        self.assertEqual(get_covering_cells(55.75, 37.62, 20000), [''])
+
+
+class NormalizeAddressTest(SimpleTestCase):
+    def test_expands_abbreviations(self):
+        self.assertEqual(
+            normalize_address('Москва, Тверская ул., д.1'),
+            'москва тверская улица дом 1',
+        )
+        self.assertEqual(
+            normalize_address('г. Москва, Ленинский пр-т, д. 30, корп. 2, стр. 1'),
+            'город москва ленинский проспект дом 30 корпус 2 строение 1',
+        )
+
+    def test_spellings_of_one_address_match(self):
+        self.assertEqual(
+            normalize_address('  МОСКВА,   Ул.Вавилова  д. 3 '),
+            normalize_address('москва улица вавилова дом 3'),
+        )
+        self.assertEqual(
+            normalize_address('Москва, Пётр Алексеев пер.'),
+            normalize_address('Москва, Петр Алексеев переулок'),
+        )
+        self.assertEqual(
+            normalize_address('Москва, ул. Тверская, д. １'),
+            normalize_address('Москва, ул. Тверская, д. 1'),
+        )
+
+    def test_keeps_hyphenated_names_and_different_houses(self):
+        self.assertEqual(
+            normalize_address('Санкт-Петербург, Невский пр-т'),
+            'санкт-петербург невский проспект',
+        )
+        self.assertNotEqual(
+            normalize_address('Москва, ул. Тверская, д. 1'),
+            normalize_address('Москва, ул. Тверская, д. 11'),
+        )
+
+    def test_abbreviations_are_expanded_only_as_whole_words(self):
+        self.assertEqual(normalize_address('Дмитровское ш.'), 'дмитровское шоссе')
+        self.assertEqual(normalize_address('Улица Гагарина'), 'улица гагарина')
+
+
+@mock.patch('geocoder.lru.time.monotonic', return_value=100)
+class LRUCacheTest(SimpleTestCase):
+    def test_evicts_least_recently_used(self, monotonic):
+        lru = LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('c'), 3)
+        self.assertEqual(lru.get_stats(), {'size': 2, 'hits': 3, 'misses': 1})
+
+    def test_entries_expire(self, monotonic):
+        lru = LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+
+        monotonic.return_value = 160
+        self.assertEqual(lru.get('a'), 1)
+        monotonic.return_value = 161
+        self.assertIsNone(lru.get('a'))
+        self.assertEqual(lru.get_stats(), {'size': 0, 'hits': 1, 'misses': 1})
+
+    def test_set_refreshes_expiry(self, monotonic):
+        lru = LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        monotonic.return_value = 150
+        lru.set('a', 2)
+
+        monotonic.return_value = 200
+        self.assertEqual(lru.get('a'), 2)
+
+    def test_delete_and_clear(self, monotonic):
+        lru = LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+
+        lru.delete('a')
+        lru.delete('missing')
+        self.assertIsNone(lru.get('a'))
+        lru.clear()
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get_stats()['size'], 0)
+
+
+class LocationQuerySetTest(TestCase):
+    def test_get_coordinates_accepts_repeated_addresses(self):
+        Location.objects.create(address='Москва, Тверская 1', latitude=55.76, longitude=37.61)
+        Location.objects.create(address='Москва, Тверская 2')
+
+        coordinates, missing_addresses = Location.objects.get_coordinates(
+            address for address in [
+                'Москва, Тверская 1', 'Москва, Тверская 1',
+                'Москва, Тверская 2', 'Москва, Тверская 2', 'Москва, Тверская 3',
+            ]
+        )
+
+        self.assertEqual(coordinates, {'Москва, Тверская 1': (55.76, 37.61)})
+        self.assertEqual(
+            missing_addresses,
+            {'Москва, Тверская 2': 'PENDING', 'Москва, Тверская 3': None},
+        )
@@ -1,3 +1,45 @@
-from django.test import TestCase
+import math
 
-# Create your tests here.
+from django.urls import reverse
+
+from foodcartapp.models import Restaurant
+from foodcartapp.tests import PerformanceTestCase
+from .views import ORDERS_CHUNK_SIZE, ORDERS_PAGE_SIZE
+
+
+# Session, user, orders and restaurants for the filter, then candidates
+# and locations for every streamed chunk
+ORDERS_PAGE_QUERIES = 4 + 2 * math.ceil(ORDERS_PAGE_SIZE / ORDERS_CHUNK_SIZE)
+
+
+class ManagerPagesPerformanceTest(PerformanceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.manager)
+
+    def test_view_orders(self):
+        content = self.assertQueriesBudget(
+            'view_orders', ORDERS_PAGE_QUERIES,
+            lambda: self.client.get(reverse('restaurateur:view_orders')),
+        )
+        self.assertNotIn('Заказов не найдено', content.decode())
+
+    def test_view_orders_filtered(self):
+        restaurant = Restaurant.objects.first()
+        self.assertQueriesBudget(
+            'view_orders_filtered', ORDERS_PAGE_QUERIES,
+            lambda: self.client.get(
+                reverse('restaurateur:view_orders'),
+                {'status': 'EN_ROUTE', 'restaurant': restaurant.id},
+            ),
+        )
+
+    def test_view_products(self):
+        self.assertQueriesBudget(
+            'view_products', 5,
+            lambda: self.client.get(reverse('restaurateur:ProductsView')),
+        )
+        self.assertQueriesBudget(
+            'view_products_cached', 4,
+            lambda: self.client.get(reverse('restaurateur:ProductsView')),
+        )
@@ -1,19 +1,30 @@
-import functools
+from datetime import datetime, time, timedelta
 
 from django import forms
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.safestring import mark_safe
 from django.views import View
 from django.urls import reverse_lazy
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
-from geopy import distance
-from operator import itemgetter
 
-from foodcartapp.models import Product, Restaurant, Order, RestaurantMenuItem
+from foodcartapp.catalogue import get_menu_index
+from foodcartapp.models import Product, Restaurant, Order, RestaurantCandidate
 from geocoder.models import Location
 
-from django.db.models import F
+from django.db.models import F, Prefetch, Q, prefetch_related_objects
+
+
+ORDERS_PAGE_SIZE = 100
+
+ORDERS_CHUNK_SIZE = 25
+
+ORDER_ROWS_PLACEHOLDER = '<!-- order rows -->'
 
 
 class Login(forms.Form):
@@ -68,24 +79,91 @@ def is_manager(user):
     return user.is_staff  # FIXME replace with specific permission
 
 
+class OrdersFilterForm(forms.Form):
+    status = forms.ChoiceField(
+        label='Статус', required=False,
+        choices=[('', 'Все'), *Order.STATUS],
+    )
+    payment_method = forms.ChoiceField(
+        label='Способ оплаты', required=False,
+        choices=[('', 'Любой'), *Order.PAYMENT_METHODS],
+    )
+    restaurant = forms.ModelChoiceField(
+        label='Ресторан', required=False, empty_label='Любой',
+        queryset=Restaurant.objects.order_by('name'),
+    )
+    created_from = forms.DateField(
+        label='Создан с', required=False,
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+    created_to = forms.DateField(
+        label='по', required=False,
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+    cursor = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.visible_fields():
+            field.field.widget.attrs['class'] = 'form-control'
+
+    def clean_cursor(self):
+        cursor = self.cleaned_data['cursor']
+        if not cursor:
+            return None
+
+        created_at, _, order_id = cursor.rpartition('_')
+        created_at = parse_datetime(created_at)
+        if not created_at or not order_id.isdigit():
+            raise forms.ValidationError('Некорректная ссылка на страницу')
+        return created_at, int(order_id)
+
+    def filter_orders(self, orders):
+        filters = self.cleaned_data
+
+        if filters['status']:
+            orders = orders.filter(status=filters['status'])
+        if filters['payment_method']:
+            orders = orders.filter(payment_method=filters['payment_method'])
+        if filters['restaurant']:
+            orders = orders.filter(restaurant=filters['restaurant'])
+        if filters['created_from']:
+            orders = orders.filter(
+                created_at__gte=get_day_start(filters['created_from']),
+            )
+        if filters['created_to']:
+            orders = orders.filter(
+                created_at__lt=get_day_start(filters['created_to'] + timedelta(days=1)),
+            )
+        if filters['cursor']:
+            created_at, order_id = filters['cursor']
+            orders = orders.filter(
+                Q(created_at__gt=created_at)
+                | Q(created_at=created_at, id__gt=order_id)
+            )
+
+        return orders.order_by('created_at', 'id')
+
+    @staticmethod
+    def make_cursor(order):
+        return f'{order.created_at.isoformat()}_{order.id}'
+
+
+def get_day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_products(request):
     restaurants = list(Restaurant.objects.order_by('name'))
-    products = list(Product.objects.prefetch_related('menu_items'))
+    products = list(Product.objects.select_related('category'))
 
-    default_availability = {restaurant.id: False for restaurant in restaurants}
-    products_with_restaurants = []
-    for product in products:
-
-        availability = {
-            **default_availability,
-            **{item.restaurant_id: item.availability for item in product.menu_items.all()},
-        }
-        orderer_availability = [availability[restaurant.id] for restaurant in restaurants]
-
-        products_with_restaurants.append(
-            (product, orderer_availability)
-        )
+    menu_index = get_menu_index()
+    restaurant_ids = [restaurant.id for restaurant in restaurants]
+    products_with_restaurants = [
+        (product, menu_index.get_availability(product.id, restaurant_ids))
+        for product in products
+    ]
 
     return render(request, template_name='products_list.html', context={
         'products_with_restaurants': products_with_restaurants,
@@ -102,41 +180,64 @@ def view_restaurants(request):
 
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_orders(request):
-    orders = (
-        Order.objects
-        .get_total_cost()
-        .annotate(products=F('positions__product'))
-        .filter(status='UNANSWERED')
-    )
+    filters = request.GET.copy()
+    filters.setdefault('status', 'UNANSWERED')
+    form = OrdersFilterForm(filters)
+
+    orders = []
+    next_page_url = None
+    if form.is_valid():
+        orders = list(
+            form.filter_orders(Order.objects.get_total_cost())
+            [:ORDERS_PAGE_SIZE + 1]
+        )
+        if len(orders) > ORDERS_PAGE_SIZE:
+            orders = orders[:ORDERS_PAGE_SIZE]
+            filters['cursor'] = form.make_cursor(orders[-1])
+            next_page_url = f'?{filters.urlencode()}'
+
+    page = render_to_string('order_items.html', request=request, context={
+        'form': form,
+        'orders_count': len(orders),
+        'next_page_url': next_page_url,
+        'order_rows': mark_safe(ORDER_ROWS_PLACEHOLDER),
+    })
+    page_head, page_tail = page.split(ORDER_ROWS_PLACEHOLDER)
 
-    menu_items_values = (
-        RestaurantMenuItem.objects
-        .filter(availability=True)
-        .values('product', 'restaurant__name', 'restaurant__address')
+    return StreamingHttpResponse(
+        stream_orders_page(request, orders, page_head, page_tail),
     )
-    restaurants_addresses = {
-        item['restaurant__address'] for item in menu_items_values
-    }
 
-    locations = get_locations(orders, restaurants_addresses)
 
-    orders_with_products = {}
-    order_query = [(order, order.products) for order in orders]
-    for order, products in order_query:
-        orders_with_products.setdefault(order, []).append(products)
+def stream_orders_page(request, orders, page_head, page_tail):
+    yield page_head
 
-    return render(request, template_name='order_items.html', context={
-        'order_items': [
-            serialize_order(order_with_products, locations, menu_items_values)
-            for order_with_products in orders_with_products.items()
-        ],
-    })
+    for chunk_start in range(0, len(orders), ORDERS_CHUNK_SIZE):
+        orders_chunk = orders[chunk_start:chunk_start + ORDERS_CHUNK_SIZE]
+        yield render_to_string('order_rows.html', request=request, context={
+            'order_items': serialize_orders(orders_chunk),
+        })
 
+    yield page_tail
 
-def serialize_order(order_with_products, locations, menu_items_values):
-    order, products = order_with_products
 
-    serialized_order = {
+def serialize_orders(orders):
+    prefetch_related_objects(orders, Prefetch(
+        'candidates',
+        queryset=(
+            RestaurantCandidate.objects
+            .select_related('restaurant')
+            .order_by(F('distance').asc(nulls_last=True))
+        ),
+    ))
+    _, missing_addresses = Location.objects.get_coordinates(
+        {order.address for order in orders}
+    )
+    return [serialize_order(order, missing_addresses) for order in orders]
+
+
+def serialize_order(order, missing_addresses):
+    return {
         'id': order.id,
         'status': order.get_status_display(),
         'payment_method': order.get_payment_method_display(),
@@ -146,58 +247,13 @@ def serialize_order(order_with_products, locations, menu_items_values):
         'phonenumber': order.phonenumber,
         'address': order.address,
         'note': order.note,
+        'is_located': order.address not in missing_addresses,
+        'is_pending': missing_addresses.get(order.address) == 'PENDING',
+        'restaurants': [
+            {
+                'name': candidate.restaurant.name,
+                'distance': candidate.distance,
+            }
+            for candidate in order.candidates.all()
+        ],
     }
-
-    order_location = locations.get(order.address)
-
-    restaurants = serialize_restaurants(
-        products, locations, order_location, menu_items_values
-    )
-    serialized_order['restaurants'] = sorted(
-        restaurants, key=itemgetter('distance'),
-    )
-
-    return serialized_order
-
-
-def serialize_restaurants(products, locations, order_location, menu_items_values):
-    restaurants_and_addresses = []
-    for product in products:
-        restaurant_and_address = {
-            (item['restaurant__name'], item['restaurant__address'])
-            for item in menu_items_values if product == item['product']
-        }
-        restaurants_and_addresses.append(restaurant_and_address)
-
-    appropriate_restaurants_and_addresses = functools.reduce(
-        set.intersection,
-        restaurants_and_addresses,
-    )
-
-    serialized_restaurants = []
-    for name, address in appropriate_restaurants_and_addresses:
-        order_distance = distance.distance(
-            order_location, locations.get(address)
-        ).km
-
-        serialized_restaurant = {
-            'name': name,
-            'distance': f'{order_distance:.3f}'
-        } 
-        serialized_restaurants.append(serialized_restaurant)
-
-    return serialized_restaurants
-
-
-def get_locations(orders, restaurants_addresses):
-    order_addresses = {order.address for order in orders}
-
-    all_addresses = order_addresses | restaurants_addresses
-
-    locations = {
-        address: (
-            Location.objects.get(address=address).latitude,
-            Location.objects.get(address=address).longitude,
-        ) for address in all_addresses
-    }
-    return locations
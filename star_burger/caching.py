@@ -0,0 +1,64 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_namespace_version(namespace):
+    version_key = f'{namespace}:version'
+    version = cache.get(version_key)
+    if version is None:
+        # Start from the clock so an evicted counter never reuses old keys
+        cache.add(version_key, time.time_ns(), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def make_key(namespace, *parts):
+    version = get_namespace_version(namespace)
+    return ':'.join([namespace, str(version), *map(str, parts)])
+
+
+def invalidate(namespace):
+    version_key = f'{namespace}:version'
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.add(version_key, time.time_ns(), timeout=None)
+
+
+def get_or_compute(namespace, key, compute, timeout=None):
+    """Return a cached value, computing it in only one process on a miss.
+
+    Concurrent callers wait for the process holding the lock instead of
+    running `compute` too. `compute` must not return None. Values live for
+    `timeout` seconds, CACHE_TIMEOUT by default, so a process-local cache
+    that missed an invalidation still catches up.
+    """
+    if timeout is None:
+        timeout = settings.CACHE_TIMEOUT
+    cache_key = make_key(namespace, key)
+    value = cache.get(cache_key)
+    if value is not None:
+        return value
+
+    lock_key = f'{cache_key}:lock'
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not cache.add(lock_key, True, timeout=LOCK_TIMEOUT):
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(cache_key)
+        if value is not None:
+            return value
+        if time.monotonic() > deadline:
+            break
+
+    try:
+        value = compute()
+        cache.set(cache_key, value, timeout=timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
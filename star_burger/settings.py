@@ -98,6 +98,12 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': env.dj_cache_url('CACHE_URL', 'locmem://'),
+}
+
+CACHE_TIMEOUT = env.int('CACHE_TIMEOUT', 300)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -130,6 +136,8 @@ INTERNAL_IPS = [
 ]
 
 
+BANNERS_STATIC_FILE = env.bool('BANNERS_STATIC_FILE', False)
+
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "assets"),
     os.path.join(BASE_DIR, "bundles"),
@@ -141,6 +149,36 @@ PHONENUMBER_DEFAULT_REGION = 'RU'
 
 YANDEX_GEOCODE_APIKEY=env.str('YANDEX_GEOCODE_APIKEY')
 
+GEOCODER_BACKEND = env.str('GEOCODER_BACKEND', 'geocoder.client.YandexBackend')
+
+GEOCODER_CONNECT_TIMEOUT = env.float('GEOCODER_CONNECT_TIMEOUT', 3.05)
+
+GEOCODER_READ_TIMEOUT = env.float('GEOCODER_READ_TIMEOUT', 5)
+
+GEOCODER_RETRIES = env.int('GEOCODER_RETRIES', 2)
+
+GEOCODER_RETRY_BACKOFF = env.float('GEOCODER_RETRY_BACKOFF', 0.5)
+
+GEOCODER_BREAKER_THRESHOLD = env.int('GEOCODER_BREAKER_THRESHOLD', 5)
+
+GEOCODER_BREAKER_RESET_TIMEOUT = env.float('GEOCODER_BREAKER_RESET_TIMEOUT', 30)
+
+GEOCODER_MAX_ATTEMPTS = env.int('GEOCODER_MAX_ATTEMPTS', 5)
+
+GEOCODER_WORKERS = env.int('GEOCODER_WORKERS', 4)
+
+GEOCODER_NEGATIVE_TTL_HOURS = env.int('GEOCODER_NEGATIVE_TTL_HOURS', 24)
+
+GEOCODER_REFRESH_AFTER_DAYS = env.int('GEOCODER_REFRESH_AFTER_DAYS', 90)
+
+GEOCODER_LOCATIONS_CACHE_SIZE = env.int('GEOCODER_LOCATIONS_CACHE_SIZE', 1024)
+
+GEOCODER_LOCATIONS_CACHE_TTL = env.int('GEOCODER_LOCATIONS_CACHE_TTL', 300)
+
+RESTAURANT_CANDIDATES_LIMIT = env.int('RESTAURANT_CANDIDATES_LIMIT', None)
+
+RESTAURANT_SEARCH_RADIUS_KM = env.float('RESTAURANT_SEARCH_RADIUS_KM', None)
+
 ROLLBAR = {
     'access_token': env.str('ROLLBAR_ACCESS_TOKEN'),
     'environment': 'development' if DEBUG else 'production',